@@ -0,0 +1,49 @@
+"""
+Startup benchmark: time-to-first-instruction of the runner.
+
+Launches `python -m cpu.main --bytecode PROG -q --max-steps 0` repeatedly, which
+covers interpreter startup, imports, argument parsing and program load but runs
+no instructions, and compares the median against a budget.
+
+    python bench/startup.py [--runs 30] [--budget-ms 80]
+
+Exits non-zero if the median exceeds the budget.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def time_command(cmd: list[str], runs: int) -> list[float]:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--budget-ms", type=float, default=80.0, help="Budget for the median time-to-first-instruction")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        prog = os.path.join(tmp, "program.bin")
+        subprocess.run([sys.executable, "-m", "cpu.main", "-q", "-o", prog], cwd=ROOT, check=True)
+        baseline = time_command([sys.executable, "-c", "pass"], args.runs)
+        ttfi = time_command([sys.executable, "-m", "cpu.main", "--bytecode", prog, "-q", "--max-steps", "0"], args.runs)
+
+    base_ms, ttfi_ms = statistics.median(baseline), statistics.median(ttfi)
+    print(f"python -c pass          : {base_ms:7.1f} ms (median of {args.runs})")
+    print(f"time-to-first-instruction: {ttfi_ms:7.1f} ms (budget {args.budget_ms:.0f} ms)")
+    print(f"runner overhead          : {ttfi_ms - base_ms:7.1f} ms")
+    return 0 if ttfi_ms <= args.budget_ms else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,38 @@
+# Gate-level adders. Bits are ints in {0, 1}; words are little-endian lists of bits.
+
+def AND(a: int, b: int) -> int:
+    return a & b
+
+def OR(a: int, b: int) -> int:
+    return a | b
+
+def XOR(a: int, b: int) -> int:
+    return a ^ b
+
+def to_bits(x: int, width: int) -> list[int]:
+    return [(x >> i) & 1 for i in range(width)]
+
+def from_bits(bits: list[int]) -> int:
+    return sum(bit << i for i, bit in enumerate(bits))
+
+def half_adder(a: int, b: int) -> tuple[int, int]:
+    """Return (sum, carry)."""
+    return XOR(a, b), AND(a, b)
+
+def full_adder(a: int, b: int, cin: int) -> tuple[int, int]:
+    """Two half adders plus an OR on the carries. Return (sum, carry)."""
+    s1, c1 = half_adder(a, b)
+    s2, c2 = half_adder(s1, cin)
+    return s2, OR(c1, c2)
+
+def ripple_carry_add(a: int, b: int, width: int = 8) -> tuple[int, int]:
+    """Add two width-bit words with a chain of full adders. Return (sum, carry_out)."""
+    carry = 0
+    out = []
+    for abit, bbit in zip(to_bits(a, width), to_bits(b, width)):
+        s, carry = full_adder(abit, bbit, carry)
+        out.append(s)
+    return from_bits(out), carry
+
+if __name__ == "__main__":
+    print(ripple_carry_add(200, 100))  # (44, 1)
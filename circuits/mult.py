@@ -0,0 +1,18 @@
+# Shift-and-add array multiplier built from the ripple-carry adder in add.py.
+from .add import AND, to_bits, ripple_carry_add
+
+def multiply(a: int, b: int, width: int = 8) -> int:
+    """
+    Multiply two width-bit words. Each bit of b gates a shifted copy of a
+    (one row of AND gates) and the rows are summed with a 2*width-bit adder.
+    Returns the full 2*width-bit product; callers mask it to their word size.
+    """
+    a_bits = to_bits(a, width)
+    product = 0
+    for i, b_bit in enumerate(to_bits(b, width)):
+        row = sum(AND(a_bit, b_bit) << (i + j) for j, a_bit in enumerate(a_bits))
+        product, _ = ripple_carry_add(product, row, 2 * width)
+    return product
+
+if __name__ == "__main__":
+    print(multiply(13, 11))  # 143
@@ -1,5 +1,6 @@
 # Compile package
 from .compile_from_ast import compile
 from .assemble import assemble
+from .analyze import estimate
 
-__all__ = ['compile', 'assemble']
+__all__ = ['compile', 'assemble', 'estimate']
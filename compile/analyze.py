@@ -0,0 +1,321 @@
+"""
+Static step-count and worst-case execution time estimator.
+
+Works on the compiler's output (list of op tuples). Loops are found from the
+backward JMPs that compile_chunk emits for `while`; each loop's exit is the JNZ
+that jumps just past that JMP, and forward JNZs are `if`s. Loop trip counts are
+bounded by symbolically executing one iteration:
+
+  - the condition gives an expression F over the variables' values at the top of
+    the iteration (the loop keeps going while F == 0, i.e. while Z is set),
+  - the body gives each variable's next value as an expression of those values,
+
+and then iterating that recurrence from the values known at loop entry, using the
+ALU's 8-bit wraparound. If exactly one variable is unknown at entry, all 256 byte
+values are tried. `while x != N` with `x = x + 1` is bounded this way, and so is
+anything else whose state is determined by the loop variables. A loop whose state
+repeats without exiting, or whose condition/update cannot be expressed, is
+"unbounded". Values are assumed to fit in a byte.
+
+The result is an upper bound on instructions executed (including HALT) and on
+cycles, using a simple cost model: one cycle per instruction byte fetched, one per
+data memory access, and eight extra for the shift-and-add multiplier.
+"""
+from .assemble import instr_size, parse_operand
+
+MEMORY_OPS = {"LDA", "STA", "ADD", "SUB", "AND", "OR", "XOR", "MUL", "LDR", "STR", "PUSH", "POP"}
+ALU_MEM_OPS = {"ADD": "add", "SUB": "sub", "AND": "and", "OR": "or", "XOR": "xor", "MUL": "mul"}
+ALU_REG_OPS = {"ADDR": "add", "SUBR": "sub", "ANDR": "and", "ORR": "or", "XORR": "xor", "MULR": "mul"}
+STORE_OPS = {"STA": 1, "STR": 2}  # mnemonic -> position of the address operand in the tuple
+MAX_TRIPS = 1 << 16
+
+def instr_cycles(instr: tuple, isa: str = "classic") -> int:
+    op = instr[0]
+    cycles = instr_size(instr, isa) + (1 if op in MEMORY_OPS else 0)
+    if op in ("MUL", "MULR"):
+        cycles += 8  # one adder pass per multiplier bit
+    return cycles
+
+# --- symbolic values: int, None (unknown), ("var", addr) or (op, a[, b]) ---
+
+def alu_eval(op: str, a: int, b: int | None = None) -> int:
+    # mirrors cpu.ALU.operate
+    match op:
+        case "add":
+            return (a + b) % 256
+        case "sub":
+            return (a - b) % 256
+        case "and":
+            return a & b
+        case "or":
+            return a | b
+        case "xor":
+            return a ^ b
+        case "mul":
+            return (a % 256) * (b % 256) % 256
+        case "not":
+            return int(not a)
+
+def combine(op: str, a, b=0):
+    if a is None or b is None:
+        return None
+    if isinstance(a, int) and isinstance(b, int):
+        return alu_eval(op, a, b)
+    return (op, a, b)
+
+def evaluate(expr, values: dict) -> int:
+    if isinstance(expr, int):
+        return expr
+    if expr[0] == "var":
+        return values[expr[1]]
+    return alu_eval(expr[0], evaluate(expr[1], values), evaluate(expr[2], values))
+
+def free_vars(expr) -> set:
+    if not isinstance(expr, tuple):
+        return set()
+    if expr[0] == "var":
+        return {expr[1]}
+    return free_vars(expr[1]) | free_vars(expr[2])
+
+class SymState:
+    """Abstract machine state. Memory defaults to 0 (fresh program) or to ("var", addr) (loop analysis)."""
+
+    def __init__(self, symbolic: bool = False):
+        self.symbolic = symbolic
+        self.mem = {}
+        self.regs = {}
+        self.flag = None  # expression whose value decides Z
+        self.stack = []
+
+    def copy(self) -> "SymState":
+        other = SymState(self.symbolic)
+        other.mem, other.regs, other.flag, other.stack = dict(self.mem), dict(self.regs), self.flag, list(self.stack)
+        return other
+
+    def load(self, addr: int):
+        if addr in self.mem:
+            return self.mem[addr]
+        return ("var", addr) if self.symbolic else 0
+
+    def clobber(self, addrs) -> None:
+        for addr in addrs:
+            self.mem[addr] = None
+        self.regs = {r: None for r in range(8)}
+        self.flag = None
+        self.stack = []
+
+    def join(self, other: "SymState") -> None:
+        """Merge the state of another path into this one; anything that differs becomes unknown."""
+        for addr in set(self.mem) | set(other.mem):
+            if self.load(addr) != other.load(addr):
+                self.mem[addr] = None
+        for r in set(self.regs) | set(other.regs):
+            if self.regs.get(r) != other.regs.get(r):
+                self.regs[r] = None
+        if self.flag != other.flag:
+            self.flag = None
+        if self.stack != other.stack:
+            self.stack = []
+
+    def step(self, instr: tuple) -> None:
+        op, args = instr[0], instr[1:]
+        regs = self.regs
+        if op == "LDI":
+            regs[0] = parse_operand(args[0]) & 0xFF  # as assembled
+        elif op == "LDA":
+            regs[0] = self.load(parse_operand(args[0]))
+        elif op == "STA":
+            self.mem[parse_operand(args[0])] = regs.get(0)
+        elif op in ALU_MEM_OPS:
+            regs[0] = self.flag = combine(ALU_MEM_OPS[op], regs.get(0), self.load(parse_operand(args[0])))
+        elif op == "NOT":
+            regs[0] = self.flag = combine("not", regs.get(0))
+        elif op == "MOV":
+            regs[args[0]] = regs.get(args[1])
+        elif op == "LDR":
+            regs[args[0]] = self.load(parse_operand(args[1]))
+        elif op == "STR":
+            self.mem[parse_operand(args[1])] = regs.get(args[0])
+        elif op == "LRI":
+            regs[args[0]] = parse_operand(args[1]) & 0xFF
+        elif op in ALU_REG_OPS:
+            regs[args[0]] = self.flag = combine(ALU_REG_OPS[op], regs.get(args[0]), regs.get(args[1]))
+        elif op == "PUSH":
+            self.stack.append(regs.get(args[0]))
+        elif op == "POP":
+            regs[args[0]] = self.stack.pop() if self.stack else None
+        # NOP, HALT and jumps do not change data state
+
+class Estimate:
+    def __init__(self, instructions: int | None, cycles: int | None, loops: list[dict]):
+        self.instructions = instructions  # upper bound, None if unbounded
+        self.cycles = cycles
+        self.loops = loops  # [{"header": addr, "trips": bound or None}]
+
+    @property
+    def bounded(self) -> bool:
+        return self.instructions is not None
+
+    def __repr__(self) -> str:
+        if not self.bounded:
+            return f"Estimate(unbounded, loops={self.loops!r})"
+        return f"Estimate(instructions<={self.instructions}, cycles<={self.cycles}, loops={self.loops!r})"
+
+def add_costs(a, b):
+    return None if a is None or b is None else a + b
+
+class Analyzer:
+    def __init__(self, program: list[tuple], isa: str = "classic"):
+        self.program = program
+        self.isa = isa
+        self.addrs = []
+        addr = 0
+        for instr in program:
+            self.addrs.append(addr)
+            addr += instr_size(instr, isa)
+        self.index = {a: i for i, a in enumerate(self.addrs)}
+        self.index[addr] = len(program)  # one past the last instruction
+        self.loops = {}  # header index -> index of the backward JMP
+        for j, instr in enumerate(program):
+            if instr[0] == "JMP" and parse_operand(instr[1]) <= self.addrs[j] and parse_operand(instr[1]) in self.index:
+                self.loops[self.index[parse_operand(instr[1])]] = j
+        self.loop_info = []
+
+    def run(self) -> Estimate:
+        steps, cycles = self.region(0, len(self.program), SymState())
+        if steps is None:
+            cycles = None
+        return Estimate(steps, cycles, sorted(self.loop_info, key=lambda info: info["header"]))
+
+    def forward_branch(self, i: int) -> int | None:
+        # index where a forward JNZ/JZ lands, or None
+        instr = self.program[i]
+        if instr[0] in ("JNZ", "JZ") and parse_operand(instr[1]) > self.addrs[i]:
+            return self.index.get(parse_operand(instr[1]))
+        return None
+
+    def written(self, lo: int, hi: int) -> set:
+        return {parse_operand(instr[pos]) for instr in self.program[lo:hi] if (pos := STORE_OPS.get(instr[0]))}
+
+    def region(self, lo: int, hi: int, state: SymState) -> tuple:
+        """Upper-bound (instructions, cycles) for straight-line-structured code in [lo, hi)."""
+        steps = cycles = 0
+        i = lo
+        while i < hi:
+            if i in self.loops and self.loops[i] < hi:
+                s, c = self.loop(i, self.loops[i], state)
+                i = self.loops[i] + 1
+            elif (then_hi := self.forward_branch(i)) is not None and then_hi <= hi:
+                then_state = state.copy()
+                s, c = self.region(i + 1, then_hi, then_state)
+                state.join(then_state)
+                s, c = add_costs(s, 1), add_costs(c, instr_cycles(self.program[i], self.isa))
+                i = then_hi
+            else:
+                state.step(self.program[i])
+                s, c = 1, instr_cycles(self.program[i], self.isa)
+                i += 1
+            steps, cycles = add_costs(steps, s), add_costs(cycles, c)
+        return steps, cycles
+
+    def symbolic_region(self, lo: int, hi: int, state: SymState) -> None:
+        # data effect of [lo, hi) with nested loops/ifs treated as clobbering what they write
+        i = lo
+        while i < hi:
+            if i in self.loops and self.loops[i] < hi:
+                state.clobber(self.written(i, self.loops[i] + 1))
+                i = self.loops[i] + 1
+            elif (then_hi := self.forward_branch(i)) is not None and then_hi <= hi:
+                state.clobber(self.written(i + 1, then_hi))
+                i = then_hi
+            else:
+                state.step(self.program[i])
+                i += 1
+
+    def loop(self, h: int, j: int, state: SymState) -> tuple:
+        exit_addr = self.addrs[j] + instr_size(self.program[j], self.isa)  # just past the back-edge JMP
+        e = next((k for k in range(h, j) if self.program[k][0] == "JNZ" and parse_operand(self.program[k][1]) == exit_addr), None)
+        written = self.written(h, j + 1)
+        if e is None:
+            state.clobber(written)
+            self.loop_info.append({"header": self.addrs[h], "trips": None})
+            return None, None
+
+        trips, exit_values = self.trip_bound(h, e, j, state)
+        self.loop_info.append({"header": self.addrs[h], "trips": trips})
+
+        cond_steps = e - h + 1  # condition plus the JNZ
+        cond_cycles = sum(instr_cycles(instr, self.isa) for instr in self.program[h:e + 1])
+        body_state = state.copy()
+        body_state.clobber(written)
+        for instr in self.program[h:e]:
+            body_state.step(instr)
+        body_steps, body_cycles = self.region(e + 1, j, body_state)
+        jmp_cycles = instr_cycles(self.program[j], self.isa)
+
+        state.clobber(written)
+        if exit_values is not None:
+            state.mem.update(exit_values)
+        if trips is None or body_steps is None:
+            return None, None
+        steps = (trips + 1) * cond_steps + trips * (body_steps + 1)
+        cycles = (trips + 1) * cond_cycles + trips * (body_cycles + jmp_cycles)
+        return steps, cycles
+
+    def trip_bound(self, h: int, e: int, j: int, entry: SymState) -> tuple:
+        """Return (max body executions or None, exact variable values at exit or None)."""
+        it = SymState(symbolic=True)
+        for instr in self.program[h:e]:
+            it.step(instr)
+        cond = it.flag
+        if cond is None:
+            return None, None
+        self.symbolic_region(e + 1, j, it)
+
+        # variables the condition depends on, closed under the body's updates
+        loop_vars, todo = set(), free_vars(cond)
+        while todo:
+            addr = todo.pop()
+            loop_vars.add(addr)
+            update = it.load(addr)
+            if update is None:
+                return None, None
+            todo |= free_vars(update) - loop_vars
+        updates = {addr: it.load(addr) for addr in loop_vars}
+
+        initial = {addr: entry.load(addr) for addr in loop_vars}
+        unknown = [addr for addr, value in initial.items() if not isinstance(value, int)]
+        if len(unknown) > 1:
+            return None, None
+        candidates = [initial] if not unknown else [{**initial, unknown[0]: v} for v in range(256)]
+
+        worst, final = 0, None
+        for values in candidates:
+            seen = set()
+            trips = 0
+            while evaluate(cond, values) == 0:
+                key = tuple(sorted(values.items()))
+                if key in seen or trips >= MAX_TRIPS:
+                    return None, None  # state repeats without exiting: never terminates
+                seen.add(key)
+                values = {addr: evaluate(update, values) for addr, update in updates.items()}
+                trips += 1
+            worst = max(worst, trips)
+            final = values
+        return worst, (final if len(candidates) == 1 else None)
+
+def estimate(program: list[tuple], isa: str = "classic") -> Estimate:
+    """Upper bound on instructions and cycles for a compiled program."""
+    return Analyzer(program, isa).run()
+
+if __name__ == "__main__":
+    from .compile_from_ast import compile
+    src = """
+            x = 0
+            y = 2
+            while x != 5
+                x = x + 1
+            endwhile
+            return x
+    """
+    print(estimate(compile(src=src)))
@@ -15,6 +15,43 @@ OPCODES = {
     0xFF: "HALT",  # 0xFF: Halt execution
 }
 
+# Extended ISA (see cpu/handlers.py): 16-bit little-endian addresses and register operands.
+EXT_OPCODES = {
+    0x00: "NOP", 0x01: "LDI", 0x02: "LDA", 0x03: "STA",
+    0x10: "ADD", 0x11: "SUB", 0x12: "AND", 0x13: "OR", 0x14: "XOR", 0x15: "NOT", 0x16: "MUL",
+    0x20: "JMP", 0x21: "JZ", 0x22: "JNZ",
+    0x30: "MOV", 0x31: "LDR", 0x32: "STR", 0x33: "LRI",
+    0x40: "ADDR", 0x41: "SUBR", 0x42: "ANDR", 0x43: "ORR", 0x44: "XORR", 0x45: "MULR",
+    0x50: "PUSH", 0x51: "POP",
+    0xFF: "HALT",
+}
+
+# Operand kinds per mnemonic in the ext ISA: "addr" is 2 bytes, "imm" and "reg" are 1 byte.
+EXT_OPERANDS = {
+    "NOP": (), "NOT": (), "HALT": (),
+    "LDI": ("imm",),
+    "LDA": ("addr",), "STA": ("addr",), "ADD": ("addr",), "SUB": ("addr",), "AND": ("addr",),
+    "OR": ("addr",), "XOR": ("addr",), "MUL": ("addr",), "JMP": ("addr",), "JZ": ("addr",), "JNZ": ("addr",),
+    "MOV": ("reg", "reg"), "LDR": ("reg", "addr"), "STR": ("reg", "addr"), "LRI": ("reg", "imm"),
+    "ADDR": ("reg", "reg"), "SUBR": ("reg", "reg"), "ANDR": ("reg", "reg"), "ORR": ("reg", "reg"),
+    "XORR": ("reg", "reg"), "MULR": ("reg", "reg"),
+    "PUSH": ("reg",), "POP": ("reg",),
+}
+
+OPERAND_SIZES = {"addr": 2, "imm": 1, "reg": 1}
+
+def instr_size(instr: tuple, isa: str = "classic") -> int:
+    """Size in bytes of one (op, *args) tuple once assembled."""
+    if isa == "classic":
+        return len(instr)
+    return 1 + sum(OPERAND_SIZES[kind] for kind in EXT_OPERANDS[instr[0]])
+
+def parse_operand(arg) -> int:
+    # Supports hex string args like '0xA1', or already-int
+    if isinstance(arg, str) and arg.startswith('0x'):
+        return int(arg, 16)
+    return int(arg)
+
 # Example of tuple-based program as produced by compile_from_ast.py:
 example_tuple_program = [
     ("LDI", 2),
@@ -34,11 +71,20 @@ example_tuple_program = [
     ("HALT",)
 ]
 
-def assemble(program: list[tuple]) -> list[int]:
+def assemble(program: list[tuple], isa: str = "classic", metrics=None) -> list[int]:
     """
     Assemble a list of tuples of op/arg as emitted by the compiler.
-    Each element is a tuple: ("OP", arg) or just ("OP",)
+    Each element is a tuple: ("OP", arg) or just ("OP",); ext ISA tuples may
+    carry several operands, e.g. ("LDR", 1, "0xa0"). metrics: optional registry.
     """
+    if metrics is None:
+        return assemble_ext(program) if isa == "ext" else assemble_classic(program)
+    with metrics.stage_timer("assemble"):
+        out = assemble_ext(program) if isa == "ext" else assemble_classic(program)
+    metrics.count("assembler_bytes_total", "Bytes assembled", len(out))
+    return out
+
+def assemble_classic(program: list[tuple]) -> list[int]:
     CODEOPS = {v: k for k, v in OPCODES.items()}
     out = []
     for instr in program:
@@ -46,11 +92,8 @@ def assemble(program: list[tuple]) -> list[int]:
             case (op, arg):  # two elements
                 codeop = CODEOPS[op]
                 out.append(codeop)
-                # Supports hex string args like '0xA1', or already-int
-                if isinstance(arg, str) and arg.startswith('0x'):
-                    out.append(int(arg, 16))
-                else:
-                    out.append(int(arg))
+                value = parse_operand(arg)
+                out.append(value & 0xFF if op == "LDI" else value)  # immediates wrap to one byte
             case (op,):      # just ("HALT",), etc
                 codeop = CODEOPS[op]
                 out.append(codeop)
@@ -58,6 +101,24 @@ def assemble(program: list[tuple]) -> list[int]:
                 raise ValueError(f"Invalid instruction tuple: {instr}")
     return out
 
+def assemble_ext(program: list[tuple]) -> list[int]:
+    CODEOPS = {v: k for k, v in EXT_OPCODES.items()}
+    out = []
+    for instr in program:
+        op, *args = instr
+        if op not in EXT_OPERANDS or len(args) != len(EXT_OPERANDS[op]):
+            raise ValueError(f"Invalid instruction tuple: {instr}")
+        out.append(CODEOPS[op])
+        for kind, arg in zip(EXT_OPERANDS[op], args):
+            value = parse_operand(arg)
+            if kind == "addr":
+                out.extend([value & 0xFF, value >> 8])  # little-endian
+            elif kind == "imm":
+                out.append(value & 0xFF)  # immediates wrap to one byte
+            else:
+                out.append(value)
+    return out
+
 if __name__ == "__main__":
     out = assemble(example_tuple_program)
     for line in out:
@@ -4,7 +4,7 @@ class ASTNode(ABC):
     pass 
 
 class Statement(ASTNode): 
-    pass 
+    line: int | None = None  # source line, set by the parser
 
 class Expression(ASTNode): # x + y + 3
     pass 
@@ -86,3 +86,10 @@ class Program:
     def __repr__(self) -> str: 
         return f"Program({self.stmts!r})"
 
+def count_nodes(node) -> int:
+    """Number of AST nodes (including Program and Block) under node."""
+    if isinstance(node, list):
+        return sum(count_nodes(n) for n in node)
+    if not isinstance(node, (ASTNode, Block, Program)):
+        return 0
+    return 1 + sum(count_nodes(v) for v in vars(node).values())
@@ -1,22 +1,32 @@
-from .ast_types import Program, Assignment, Return, Expression, Variable, Literal, BinOp, UnaryOp, If, Block
+from contextlib import nullcontext
+from .ast_types import Program, Assignment, Return, Expression, Variable, Literal, BinOp, UnaryOp, If, While, Block, count_nodes
 from .parse import parse 
 from .lex import lex
+from .assemble import instr_size
 
 TMP_ADDR = 0xF0  # Use address 240 for temp storage (far from program code)
 VAR_START_ADDR = 0xA0  # Variables start at address 160 (leave room for ~80 instructions)
+
+# ext ISA: expression temporaries live in R1..R6; R7 is scratch for values spilled to the stack
+NUM_TEMP_REGS = 6
+SCRATCH_REG = 7
+ALU_REG_OPS = {"+": "ADDR", "-": "SUBR", "*": "MULR", "and": "ANDR", "or": "ORR", "^": "XORR", "==": "SUBR", "!=": "SUBR"}
  
 # Make variables a global
 variables = {}
+line_table = {}  # source line -> address of its first instruction (used by the debugger)
+target_isa = "classic"  # set per compile call
+var_base = VAR_START_ADDR  # address of the first variable slot
 
 def isvar(name: str) -> bool:
     global variables
     return name in variables
 
 def compile_assignment(assignment: Assignment) -> list[tuple]:
-    global variables, VAR_START_ADDR
+    global variables, var_base
     out = []
     if assignment.var not in variables:
-        variables[assignment.var] = hex(VAR_START_ADDR + len(variables))
+        variables[assignment.var] = hex(var_base + len(variables))
 
     out.extend(compile_expression(assignment.expr))
     out.append(("STA", variables[assignment.var]))
@@ -30,6 +40,8 @@ def compile_return(ret: Return) -> list[tuple]:
 
 def compile_binop(binop: BinOp, temp_depth: int = 0) -> list[tuple]:
     global TMP_ADDR
+    if target_isa == "ext":
+        return compile_binop_ext(binop, temp_depth)
     out = []
     stack_ptr = TMP_ADDR + temp_depth
     
@@ -66,12 +78,37 @@ def compile_binop(binop: BinOp, temp_depth: int = 0) -> list[tuple]:
                 raise RuntimeError(f"Unsupported binary operator: {binop.op}")
     return out 
 
+def compile_binop_ext(binop: BinOp, temp_depth: int = 0) -> list[tuple]:
+    # Same evaluation order as compile_binop, but the first operand is parked in a
+    # register instead of TMP_ADDR, so no memory traffic is needed for temporaries.
+    if binop.op not in ALU_REG_OPS:
+        raise RuntimeError(f"Unsupported binary operator: {binop.op}")
+    first, second = (binop.right, binop.left) if binop.op == "-" else (binop.left, binop.right)
+    reg = temp_depth + 1  # R1..R<temp_depth> hold operands of enclosing expressions
+    out = []
+    out.extend(compile_expression(first, temp_depth))  # nothing is parked at this level yet
+    if reg <= NUM_TEMP_REGS:
+        out.append(("MOV", reg, 0))
+        out.extend(compile_expression(second, temp_depth + 1))
+    else:  # out of registers: spill to the stack
+        out.append(("PUSH", 0))
+        out.extend(compile_expression(second, temp_depth + 1))
+        out.append(("POP", SCRATCH_REG))
+        reg = SCRATCH_REG
+    out.append((ALU_REG_OPS[binop.op], 0, reg))
+    if binop.op == "!=":
+        out.append(("NOT",))
+    return out
+
 def len_tuple_list(lst: list[tuple]) -> int:
-    return sum(len(t) for t in lst)
+    return sum(instr_size(t, target_isa) for t in lst)
 
 def compile_chunk(block: Block, curr_addr: int) -> list[tuple]: 
+    jump_sz = instr_size(("JMP", 0), target_isa)
     out = []
     for stmt in block.stmts:
+        if stmt.line is not None:
+            line_table.setdefault(stmt.line, curr_addr + len_tuple_list(out))
         match stmt: 
             case Assignment():
                 out.extend(compile_assignment(stmt))
@@ -82,15 +119,15 @@ def compile_chunk(block: Block, curr_addr: int) -> list[tuple]:
             case If(): 
                 compiled_condition = compile_expression(stmt.cond)
                 out.extend(compiled_condition)
-                compiled_then = compile_chunk(stmt.then, curr_addr + len_tuple_list(out) + 2)
-                out.append(("JNZ", curr_addr + len_tuple_list(out) + len_tuple_list(compiled_then) + 2))
+                compiled_then = compile_chunk(stmt.then, curr_addr + len_tuple_list(out) + jump_sz)
+                out.append(("JNZ", curr_addr + len_tuple_list(out) + len_tuple_list(compiled_then) + jump_sz))
                 out.extend(compiled_then)
             case While():
+                ckpt = curr_addr + len_tuple_list(out) # loop back to re-evaluate the condition
                 compiled_condition = compile_expression(stmt.cond)
                 out.extend(compiled_condition)
-                ckpt = curr_addr + len_tuple_list(out) 
-                compiled_body = compile_chunk(stmt.body, curr_addr + len_tuple_list(out) + 2)
-                out.append(("JNZ", curr_addr + len_tuple_list(out) + len_tuple_list(compiled_body) + 2 + 2)) # 2 for jnz, 2 for jmp
+                compiled_body = compile_chunk(stmt.body, curr_addr + len_tuple_list(out) + jump_sz)
+                out.append(("JNZ", curr_addr + len_tuple_list(out) + len_tuple_list(compiled_body) + jump_sz + jump_sz)) # one for jnz, one for jmp
                 out.extend(compiled_body)
                 out.append(("JMP", ckpt))
 
@@ -132,25 +169,47 @@ def compile_expression(expr: Expression, temp_depth: int = 0) -> list[tuple]:
             return compile_unaryop(expr, temp_depth)
 
 def compile_ast(program: Program) -> list[tuple]:
-    global variables
+    global variables, var_base
     out = compile_chunk(Block(program.stmts), 0)
+    if target_isa == "ext":
+        # Variables go right after the code. Operand widths are fixed, so recompiling
+        # with the final base produces code of exactly the same size.
+        variables = {}
+        line_table.clear()
+        var_base = len_tuple_list(out)
+        out = compile_chunk(Block(program.stmts), 0)
+    elif len_tuple_list(out) > VAR_START_ADDR:
+        raise RuntimeError(f"Program needs {len_tuple_list(out)} bytes but classic ISA code must fit below {hex(VAR_START_ADDR)}; compile with isa='ext'")
     return out 
 
-def compile(file: str = "program.txt", src: str | None = None) -> list[tuple]:
-    global variables
+def compile(file: str = "program.txt", src: str | None = None, isa: str = "classic", metrics=None) -> list[tuple]:
+    # metrics: an optional registry (cpu.metrics.Registry or anything with stage_timer/count)
+    global variables, var_base, target_isa
     variables = {}  # Reset variables for every compile call
+    line_table.clear()
+    target_isa = isa
+    var_base = VAR_START_ADDR if isa == "classic" else 0
     if src is None:
         with open(file, "r") as f:
             program_text = f.read()
     else:
         program_text = src
     
+    timer = metrics.stage_timer if metrics is not None else (lambda stage: nullcontext())
     # lex 
-    tokens = lex(program_text)
+    with timer("lex"):
+        tokens = lex(program_text)
     # parse 
-    ast = parse(tokens)
+    with timer("parse"):
+        ast = parse(tokens)
     # compile
-    return compile_ast(ast)
+    with timer("compile_ast"):
+        out = compile_ast(ast)
+    if metrics is not None:
+        metrics.count("compiler_tokens_total", "Tokens lexed", len(tokens))
+        metrics.count("compiler_ast_nodes_total", "AST nodes parsed", count_nodes(ast))
+        metrics.count("compiler_instructions_total", "Instructions emitted", len(out))
+    return out
 
 if __name__ == "__main__":
     src = """
@@ -2,18 +2,22 @@ import re
 from typing import Any
 
 class Token: 
-    def __init__(self, type_: str, value: Any | None = None):
+    def __init__(self, type_: str, value: Any | None = None, line: int | None = None):
         self.type = type_
         self.value = value
+        self.line = line  # 1-based source line
 
     def __repr__(self) -> str: 
         return f"{self.type}: {self.value}"
 
 def lex(program: str) -> list[Token]:
     tokens = []
-    for line in program.split("\n"):
-        tokens.extend(lex_line(line))
-        tokens.append(Token('NEWLINE', '\n'))
+    for lineno, line in enumerate(program.split("\n"), start=1):
+        line_tokens = lex_line(line)
+        for token in line_tokens:
+            token.line = lineno
+        tokens.extend(line_tokens)
+        tokens.append(Token('NEWLINE', '\n', lineno))
     return tokens
 
 
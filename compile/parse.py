@@ -1,5 +1,5 @@
 from .lex import lex, Token
-from .ast_types import Expression, Variable, Literal, Assignment, Return, Program, ASTNode, UnaryOp, BinOp, If, Statement, Block
+from .ast_types import Expression, Variable, Literal, Assignment, Return, Program, ASTNode, UnaryOp, BinOp, If, While, Statement, Block
 
 # (not a) == (b + 3)
     # BinOp(UnaryOp(Variable("a")), "==", BinOp(Variable("b"), "+", Literal(3)))
@@ -40,6 +40,11 @@ def parse_expr(tokens: list[Token]) -> Expression: # need to solve precedence an
             if tok.type == 'OP' and tok.value in ['+', '-']: 
                 return BinOp(parse_expr(tokens[:i]), tok.value, parse_expr(tokens[i+1:]))
 
+        for i in range(len(tokens) - 1, -1, -1):
+            tok = tokens[i]
+            if tok.type == 'OP' and tok.value == '*': 
+                return BinOp(parse_expr(tokens[:i]), tok.value, parse_expr(tokens[i+1:]))
+
         raise RuntimeError(f"Expected binary operator, got {tokens[0].type}")
 
 
@@ -93,11 +98,13 @@ def parse_chunk(i: int, stmts: list[list[Token]]) -> list[ASTNode]:
                 parsed.append(While(condn, Block(parsed_block)))
             else:
                 raise RuntimeError(f"Expected if or while keyword, got {curr_line[0].type}")
+            parsed[-1].line = curr_line[0].line
             
         elif curr_line[0].type in ['ENDIF', 'ENDWHILE']:
             return i + 1, parsed 
         else:
             parsed.append(parse_one_liner(curr_line))
+            parsed[-1].line = curr_line[0].line
             i += 1
 
     return i, parsed
@@ -1,4 +1,10 @@
 # CPU package
-from .cpu import CPU, ALU, Memory, ControlUnit
-
+# Submodules are imported on first attribute access so that `python -m cpu.main`
+# does not pay for the emulator before it knows it needs it.
 __all__ = ['CPU', 'ALU', 'Memory', 'ControlUnit']
+
+def __getattr__(name):
+    if name in __all__:
+        from . import cpu
+        return getattr(cpu, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
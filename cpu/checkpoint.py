@@ -0,0 +1,247 @@
+"""
+Periodic checkpoints and bit-exact resume for long runs.
+
+A checkpoint directory holds one base file (every non-zero page of memory) and a
+chain of delta files, each holding only the pages written since the previous
+checkpoint, plus the registers, flags, total step count and engine of the run.
+MANIFEST names the current base and deltas, and the sequence number files are
+named from, so no name is ever reused. Every file, MANIFEST included, is written
+to a temp file, fsynced and renamed into place, so a crash leaves either the old
+chain or the new one, never a torn file.
+
+Dirty pages are found by wrapping the store handlers (STA/STR/PUSH) in a private
+copy of the handler table, as the debugger does for watchpoints, so the engines
+themselves are unchanged. Every `compact_every` deltas a fresh base replaces the
+chain, which keeps resume cheap; that full write is the only cost that scales
+with memory size.
+
+    ckpt = Checkpointer(cpu, "ckpt/", every_steps=100_000)
+    ckpt.run(10_000_000)
+    ...
+    ckpt = resume("ckpt/", 10_000_000)  # after a restart
+"""
+import json
+import os
+import tempfile
+import time
+import zlib
+from .debugger import STORE_OPS
+
+PAGE_SIZE = 256
+PROBE_STEPS = 5_000  # steps between clock checks when checkpointing on a time interval
+MANIFEST = "MANIFEST"
+
+def store_target(cu, name: str) -> int:
+    # peek operands through the backing store so instrumented memory does not count them
+    mem, ip = cu.memory.memory, cu.registers["IP"]
+    if name == "PUSH":
+        return cu.registers["SP"] - 1
+    if cu.isa == "classic":
+        return mem[ip + 1]
+    at = ip + (2 if name == "STR" else 1)
+    return mem[at] | (mem[at + 1] << 8)
+
+def _encode_page(page) -> str:
+    return bytes(page).hex()
+
+def _decode_page(page: str) -> list[int]:
+    return list(bytes.fromhex(page))
+
+def _write_atomic(path: str, data: bytes) -> None:
+    directory = os.path.dirname(path)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    dir_fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)  # make the rename itself durable
+    finally:
+        os.close(dir_fd)
+
+def _read_manifest(directory: str) -> dict | None:
+    try:
+        with open(os.path.join(directory, MANIFEST)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def _read(path: str) -> dict:
+    with open(path, "rb") as f:
+        return json.loads(zlib.decompress(f.read()))
+
+class Checkpointer:
+    def __init__(self, cpu, directory: str, every_steps: int | None = 100_000,
+                 every_seconds: float | None = None, compact_every: int = 32):
+        if every_steps is None and every_seconds is None:
+            raise ValueError("Checkpoint every N steps, every T seconds, or both")
+        self.cpu = cpu
+        self.directory = directory
+        self.every_steps = every_steps
+        self.every_seconds = every_seconds
+        self.compact_every = compact_every
+        self.steps = 0  # total steps of the run, across resumes
+        self.halted = False
+        self.base = None
+        self.deltas = []
+        manifest = _read_manifest(directory)
+        # number of the next checkpoint file; continues an existing chain's numbering so a
+        # new run never overwrites a file the current MANIFEST still names
+        self.seq = manifest["seq"] if manifest is not None else 0
+        self.saved = None  # (steps, halted) at the last checkpoint
+        self.dirty = set()  # pages written since the last checkpoint
+        self.written = 0  # checkpoint files written by this instance
+        os.makedirs(directory, exist_ok=True)
+        cu = cpu.control_unit
+        cu.handlers = dict(cu.handlers)  # private copy, so the shared ISA table stays untouched
+        for name in STORE_OPS:
+            if name in cu.handlers:
+                cu.handlers[name] = self._tracked(name, cu.handlers[name])
+
+    def _tracked(self, name, handler):
+        def tracked_handler(control_unit):
+            self.dirty.add(store_target(control_unit, name) // PAGE_SIZE)
+            return handler(control_unit)
+        return tracked_handler
+
+    # --- writing ---
+
+    def state(self) -> dict:
+        cu = self.cpu.control_unit
+        return {
+            "isa": self.cpu.isa,
+            "mem_sz": len(self.cpu.memory),
+            "registers": cu.registers,
+            "flags": cu.flags,
+            "steps": self.steps,
+            "halted": self.halted,
+            "engine": self.cpu.engine,
+        }
+
+    def checkpoint(self) -> str:
+        """
+        Write a delta (or a new base when due) and return its file name. Nothing is
+        written when the run has not moved since the last checkpoint.
+        """
+        if self.base is not None and self.saved == (self.steps, self.halted) and not self.dirty:
+            return self.deltas[-1] if self.deltas else self.base
+        if self.base is None or len(self.deltas) >= self.compact_every:
+            return self._write_base()
+        mem = self.cpu.memory
+        pages = {p: _encode_page(mem[p * PAGE_SIZE:(p + 1) * PAGE_SIZE]) for p in sorted(self.dirty)}
+        name = self._next_name("delta")
+        if name in self.deltas:
+            raise RuntimeError(f"Checkpoint {name} is already in the chain")
+        self._write(name, {"kind": "delta", "state": self.state(), "pages": pages})
+        self.deltas.append(name)
+        self._write_manifest()
+        return name
+
+    def _write_base(self) -> str:
+        image = self.cpu.memory.snapshot()
+        pages = {}
+        for p in range(0, (len(image) + PAGE_SIZE - 1) // PAGE_SIZE):
+            page = image[p * PAGE_SIZE:(p + 1) * PAGE_SIZE]
+            if any(page):  # zero pages are implied, so sparse images stay small
+                pages[p] = _encode_page(page)
+        name = self._next_name("base")
+        self._write(name, {"kind": "base", "state": self.state(), "pages": pages})
+        self.base, self.deltas = name, []
+        self._write_manifest()
+        self._remove_stale()
+        return name
+
+    def _next_name(self, kind: str) -> str:
+        name = f"{kind}-{self.seq:08d}.ckpt"
+        self.seq += 1
+        return name
+
+    def _write(self, name: str, payload: dict) -> None:
+        data = zlib.compress(json.dumps(payload, separators=(",", ":")).encode())
+        _write_atomic(os.path.join(self.directory, name), data)
+        self.dirty.clear()
+        self.saved = (self.steps, self.halted)
+        self.written += 1
+
+    def _write_manifest(self) -> None:
+        manifest = json.dumps({"base": self.base, "deltas": self.deltas, "seq": self.seq}).encode()
+        _write_atomic(os.path.join(self.directory, MANIFEST), manifest)
+
+    def _remove_stale(self) -> None:
+        # files from older chains, or written by a run that crashed before updating MANIFEST
+        for name in os.listdir(self.directory):
+            if name.endswith(".ckpt") and name != self.base:
+                os.unlink(os.path.join(self.directory, name))
+
+    # --- running ---
+
+    def run(self, max_steps: int = 10_000) -> int:
+        """
+        CPU.run with checkpoints; max_steps bounds the total steps of the run, including
+        steps taken before a resume. A final checkpoint is written when the run stops.
+        """
+        cpu = self.cpu
+        if self.base is None:
+            self.checkpoint()
+        last_steps, last_time = self.steps, time.monotonic()
+        while self.steps < max_steps and not self.halted:
+            chunk = max_steps - self.steps
+            if self.every_steps is not None:
+                chunk = min(chunk, last_steps + self.every_steps - self.steps)
+            if self.every_seconds is not None:
+                chunk = min(chunk, PROBE_STEPS)
+            cpu.run(chunk)
+            self.steps += cpu.steps
+            self.halted = cpu.halted
+            due_steps = self.every_steps is not None and self.steps - last_steps >= self.every_steps
+            due_time = self.every_seconds is not None and time.monotonic() - last_time >= self.every_seconds
+            if (due_steps or due_time) and not self.halted and self.steps < max_steps:
+                self.checkpoint()
+                last_steps, last_time = self.steps, time.monotonic()
+        self.checkpoint()
+        cpu.steps = self.steps
+        cpu.halted = self.halted
+        return cpu.control_unit.registers["ACC"]
+
+    # --- resuming ---
+
+    @classmethod
+    def restore(cls, directory: str, metrics=None, mapped: bool = False, mem_image: str | None = None,
+                **options) -> "Checkpointer":
+        """Rebuild the CPU from the latest checkpoint in directory, ready to run further."""
+        from .cpu import CPU
+        from .verify import verify
+        manifest = _read_manifest(directory)
+        if manifest is None:
+            raise FileNotFoundError(f"No checkpoint in {directory}")
+        chain = [_read(os.path.join(directory, name)) for name in [manifest["base"], *manifest["deltas"]]]
+        state = chain[-1]["state"]
+        cpu = CPU(state["mem_sz"], isa=state["isa"], metrics=metrics, mapped=mapped, mem_image=mem_image)
+        cpu.memory.clear()
+        for payload in chain:
+            for p, page in payload["pages"].items():
+                cpu.memory.load_bytes(_decode_page(page), at=int(p) * PAGE_SIZE)
+        cpu.control_unit.registers = dict(state["registers"])
+        cpu.control_unit.flags = dict(state["flags"])
+        cpu.verification = verify(cpu.memory, cpu.isa)
+        # continue on the engine the run started on; all engines give identical results,
+        # but only memory that verifies now may take the unchecked one, whatever the file says
+        cpu.fast_path = cpu.verification.fast_path_ok and state["engine"] == "fast" and metrics is None
+        ckpt = cls(cpu, directory, **options)
+        ckpt.steps = state["steps"]
+        ckpt.halted = state["halted"]
+        ckpt.saved = (state["steps"], state["halted"])
+        ckpt.base, ckpt.deltas = manifest["base"], list(manifest["deltas"])
+        return ckpt
+
+def resume(directory: str, max_steps: int = 10_000, **options) -> Checkpointer:
+    """Continue the run checkpointed in directory until it halts or reaches max_steps in total."""
+    ckpt = Checkpointer.restore(directory, **options)
+    ckpt.run(max_steps)
+    return ckpt
@@ -1,5 +1,5 @@
-from .handlers import OPCODES, OPCODE_ARGCOUNTS, HANDLERS
-from .utils import print_state 
+import time
+from .handlers import ISAS, REG_NAMES, MAX_EXT_MEM
 
 class ALU: 
     def operate(self, op: str, a: int, b: int | None = None) -> tuple[int, dict]: 
@@ -15,10 +15,11 @@ class ALU:
             result = a | b
         elif op == "xor":
             result = a ^ b
+        elif op == "mul":
+            from circuits.mult import multiply  # only programs that multiply pay for the import
+            result = multiply(a % 256, b % 256) % 256
         elif op == "not":
-            print(f"ALU 'not' input before: {a}")
             result = int(not a)
-            print(f"ALU 'not' result after: {result}")
         else: 
             raise NotImplementedError(f"Operation {op} not implemented")
         return result, {"Z": result == 0, "N": result < 0}
@@ -45,32 +46,52 @@ class Memory:
     def load_bytes(self, bytes_: list[int], at: int = 0) -> None: 
         # used to load programs into memory at beginning of execution
         for i, byte in enumerate(bytes_):
+            if not 0 <= byte <= 0xFF:
+                raise ValueError(f"Byte {byte} at offset {i} does not fit in a memory cell")
             self.memory[at + i] = byte
 
+    def snapshot(self) -> list[int]:
+        # copy of the full memory image
+        return list(self.memory)
+
+    def restore(self, image: list[int]) -> None:
+        self.memory[:] = image
+
+    def clear(self) -> None:
+        self.memory[:] = [0] * len(self.memory)
+
 class ControlUnit: 
-    def __init__(self, memory: Memory, alu: ALU):
+    def __init__(self, memory: Memory, alu: ALU, isa: str = "classic"):
         self.memory = memory
         self.alu = alu
+        self.isa = isa
+        self.opcodes, self.argcounts, self.handlers = ISAS[isa]
+        self.reset()
+
+    def reset(self) -> None:
         self.registers = {
             "IP": 0,
             "ACC": 0,
         }
+        if self.isa == "ext":
+            self.registers.update({name: 0 for name in REG_NAMES[1:]})
+            self.registers["SP"] = len(self.memory)  # stack grows down from the top of memory
         self.flags = {"Z": False, "N": False}
 
     def update_ip(self, opcode_byte: int) -> None: 
-        self.registers["IP"] += OPCODE_ARGCOUNTS[opcode_byte] + 1
+        self.registers["IP"] += self.argcounts[opcode_byte] + 1
     
     def fetch(self) -> int: 
         opcode = self.memory.read(self.registers["IP"])
-        if not opcode in OPCODES:
+        if not opcode in self.opcodes:
             raise ValueError(f"Invalid opcode: {opcode}")
         return opcode
 
     def decode(self, opcode: int) -> str: 
-        return OPCODES[opcode]
+        return self.opcodes[opcode]
 
     def execute(self, opcode_name: str) -> tuple[bool, dict, bool]: 
-        return HANDLERS[opcode_name](self)
+        return self.handlers[opcode_name](self)
     
     def clock_cycle(self) -> bool: # (memory, instruction ptr) -> memory', instruction ptr'
         """Execute one instruction. Return False on HALT, True otherwise."""
@@ -89,26 +110,116 @@ class ControlUnit:
             self.update_ip(opcode)
         
         return True
+
+    def run_unchecked(self, max_steps: int) -> int:
+        """
+        Fast engine for programs that passed verify(): no opcode validation and no
+        per-step decode, just a 256-entry table of (handler, size). Return steps executed.
+        """
+        table = [None] * 256
+        for opcode, name in self.opcodes.items():
+            table[opcode] = (self.handlers[name], self.argcounts[opcode] + 1)
+        registers, flags, mem = self.registers, self.flags, self.memory.memory
+        step = 0
+        while step < max_steps:
+            handler, size = table[mem[registers["IP"]]]
+            contin, new_flags, touched_ip = handler(self)
+            if new_flags is not None:
+                flags["Z"] = new_flags["Z"]
+                flags["N"] = new_flags["N"]
+            if not contin:
+                break
+            if not touched_ip:
+                registers["IP"] += size
+            step += 1
+        return step
         
 class CPU: 
-    def __init__(self, mem_sz: int = 256, verbose: bool = False): 
+    def __init__(self, mem_sz: int = 256, verbose: bool = False, isa: str = "classic", metrics=None,
+                 mapped: bool = False, mem_image: str | None = None): 
+        if isa not in ISAS:
+            raise ValueError(f"Unknown ISA: {isa}")
+        if isa == "ext" and mem_sz > MAX_EXT_MEM:
+            raise ValueError(f"The ext ISA addresses at most {MAX_EXT_MEM} bytes, got {mem_sz}")
         self.mem_sz = mem_sz
-        self.memory = Memory(mem_sz)
+        self.isa = isa
+        self.metrics = metrics  # a metrics.Registry selects the instrumented engine
+        mapped = mapped or mem_image is not None  # mmap-backed memory, optionally persisted to mem_image
+        if metrics is not None:
+            from .instrumented import CountingMemory, CountingMappedMemory, InstrumentedControlUnit
+            memory_cls = CountingMappedMemory if mapped else CountingMemory
+            control_unit_cls = InstrumentedControlUnit
+        elif mapped:
+            from .mapped import MappedMemory
+            memory_cls, control_unit_cls = MappedMemory, ControlUnit
+        else:
+            memory_cls, control_unit_cls = Memory, ControlUnit
+        self.memory = memory_cls(mem_sz, path=mem_image) if mapped else memory_cls(mem_sz)
         self.alu = ALU()
-        self.control_unit = ControlUnit(self.memory, self.alu)
+        self.control_unit = control_unit_cls(self.memory, self.alu, isa)
         self.verbose = verbose
+        self.steps = 0  # steps executed by the last run
+        self.halted = False  # whether the last run ended on HALT (rather than the step budget)
+        self.verification = None  # VerifyResult of the loaded program
+        self.fast_path = False
+
+    def reset(self) -> None:
+        """Zero memory and registers so the instance can be reused for another program."""
+        self.memory.clear()
+        self.control_unit.reset()
+        self.steps = 0
+        self.halted = False
+        self.verification = None
+        self.fast_path = False
 
     def load_program(self, program: list[int]) -> None:
         if len(program) > len(self.memory):
             raise ValueError(f"Program is too large for memory")
         self.memory.load_bytes(program)
+        from .verify import verify
+        self.verification = verify(self.memory, self.isa)
+        # Only verified, non-self-modifying programs skip per-step checks. The instrumented
+        # engine keeps its own clock_cycle, so it always takes the checked path.
+        self.fast_path = self.verification.fast_path_ok and self.metrics is None
+
+    @property
+    def engine(self) -> str:
+        """Name of the loop run() will use."""
+        if self.verbose:
+            return "verbose"
+        if self.metrics is not None:
+            return "instrumented"
+        return "fast" if self.fast_path else "checked"
+
+    def run(self, max_steps: int = 10_000) -> int:
+        start = time.perf_counter()
+        if self.verbose:
+            self.steps = self._run_verbose(max_steps)
+        elif self.fast_path:
+            self.steps = self.control_unit.run_unchecked(max_steps)
+        else:
+            self.steps = self._run(max_steps)
+        self.halted = self.steps < max_steps  # the loop only stops early on HALT
+        if self.metrics is not None:
+            from .instrumented import publish
+            publish(self, self.metrics, self.steps, time.perf_counter() - start)
+        return self.control_unit.registers["ACC"]
+
+    def _run(self, max_steps: int) -> int:
+        clock_cycle = self.control_unit.clock_cycle
+        step = 0 
+        while step < max_steps:
+            if not clock_cycle():
+                break
+            step += 1
+        return step
 
-    def run(self, max_steps: int = 10_000) -> None:
+    def _run_verbose(self, max_steps: int) -> int:
+        from .utils import print_state
         step = 0 
         while step < max_steps:
-            if self.verbose:
-                print_state(self, step)
+            print_state(self, step)
             if not self.control_unit.clock_cycle():
                 break
             step += 1
-        return self.control_unit.registers["ACC"]
\ No newline at end of file
+        return step
\ No newline at end of file
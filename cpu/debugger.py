@@ -0,0 +1,282 @@
+from .handlers import read_addr16
+
+BRK_OPCODE = 0xCC  # trap opcode patched over breakpoint addresses; unused by both ISAs
+STORE_OPS = ("STA", "STR", "PUSH")  # the only instructions that write memory
+
+def stdin_commands():
+    while True:
+        try:
+            yield input("(dbg) ")
+        except EOFError:
+            return
+
+class Debugger:
+    """
+    Breakpoints, watchpoints and reverse stepping over a CPU.
+
+    Nothing is checked per step. Breakpoints are software traps: the opcode byte of
+    a reachable instruction is replaced by BRK, whose handler stops the run loop;
+    other addresses are refused, since a trap there would be read as data. Watchpoints
+    wrap only the store handlers, so the check runs on STA/STR/PUSH and nowhere else.
+    Reverse stepping restores the nearest earlier snapshot and deterministically
+    re-executes forward to the target step.
+    """
+
+    def __init__(self, cpu, snapshot_every: int = 1000, max_snapshots: int = 64,
+                 line_table: dict | None = None, variables: dict | None = None):
+        self.cpu = cpu
+        self.line_table = line_table or {}
+        self.variables = variables or {}
+        self.snapshot_every = snapshot_every
+        self.max_snapshots = max_snapshots
+        cu = cpu.control_unit
+        # private copies, so the shared ISA tables stay untouched
+        cu.opcodes = {**cu.opcodes, BRK_OPCODE: "BRK"}
+        cu.argcounts = {**cu.argcounts, BRK_OPCODE: 0}
+        cu.handlers = dict(cu.handlers)
+        cu.handlers["BRK"] = self._handle_brk
+        self._store_handlers = {name: cu.handlers[name] for name in STORE_OPS if name in cu.handlers}
+        if cpu.verification is None:
+            from .verify import verify
+            cpu.verification = verify(cpu.memory, cpu.isa)
+        self.instructions = set(cpu.verification.instructions)  # valid breakpoint addresses
+        self.breakpoints = {}  # addr -> original byte
+        self.watchpoints = set()
+        self.steps = 0
+        self.halted = False
+        self.stop_reason = None
+        self.last_watch = None  # (addr, old, new) of the last watchpoint hit
+        self.snapshots = {}  # step -> (memory image, registers, flags)
+        self._take_snapshot()
+
+    # --- breakpoints / watchpoints ---
+
+    def add_breakpoint(self, addr: int) -> None:
+        # A trap over an operand or data byte would be read as a value, or overwritten by
+        # the program's own stores, so only the first byte of an instruction may hold one.
+        if addr not in self.instructions:
+            raise ValueError(f"{addr} is not the start of a reachable instruction (use watch for data)")
+        if addr not in self.breakpoints:
+            self.breakpoints[addr] = self.cpu.memory[addr]
+            self.cpu.memory[addr] = BRK_OPCODE
+
+    def add_line_breakpoint(self, line: int) -> int:
+        if line not in self.line_table:
+            raise ValueError(f"No code for source line {line}")
+        addr = self.line_table[line]
+        self.add_breakpoint(addr)
+        return addr
+
+    def remove_breakpoint(self, addr: int) -> None:
+        if addr in self.breakpoints:
+            self.cpu.memory[addr] = self.breakpoints.pop(addr)
+
+    def add_watchpoint(self, target: int | str) -> int:
+        addr = self._resolve(target)
+        self.watchpoints.add(addr)
+        self._install_watch_handlers()
+        return addr
+
+    def remove_watchpoint(self, target: int | str) -> None:
+        self.watchpoints.discard(self._resolve(target))
+        self._install_watch_handlers()
+
+    def _resolve(self, target: int | str) -> int:
+        # variable name (from the compiler's `variables` map) or address
+        if isinstance(target, str) and target in self.variables:
+            return int(self.variables[target], 16)
+        if isinstance(target, str):
+            return int(target, 0)
+        return target
+
+    def _install_watch_handlers(self) -> None:
+        cu = self.cpu.control_unit
+        for name, handler in self._store_handlers.items():
+            cu.handlers[name] = self._watched(name, handler) if self.watchpoints else handler
+
+    def _watched(self, name, handler):
+        def watched_handler(control_unit):
+            addr = self._store_target(name)
+            old = control_unit.memory.read(addr) if addr in self.watchpoints else None
+            contin, flags, touched_ip = handler(control_unit)
+            if addr in self.watchpoints:
+                self.last_watch = (addr, old, control_unit.memory.read(addr))
+                self.stop_reason = "watchpoint"
+                return False, flags, touched_ip  # stop the run loop; _run finishes the instruction
+            return contin, flags, touched_ip
+        return watched_handler
+
+    def _store_target(self, name: str) -> int:
+        cu = self.cpu.control_unit
+        ip = cu.registers["IP"]
+        if name == "PUSH":
+            return cu.registers["SP"] - 1
+        if cu.isa == "classic":
+            return cu.memory.read(ip + 1)
+        return read_addr16(cu, ip + (2 if name == "STR" else 1))
+
+    def _handle_brk(self, control_unit):
+        self.stop_reason = "breakpoint"
+        return False, None, True
+
+    # --- snapshots ---
+
+    def _take_snapshot(self) -> None:
+        image = self.cpu.memory.snapshot()
+        for addr, byte in self.breakpoints.items():
+            image[addr] = byte
+        cu = self.cpu.control_unit
+        self.snapshots[self.steps] = (image, dict(cu.registers), dict(cu.flags))
+        if len(self.snapshots) > self.max_snapshots:
+            # keep step 0 so any step can still be reached by replay
+            del self.snapshots[min(step for step in self.snapshots if step != 0)]
+
+    def _restore_snapshot(self, step: int) -> None:
+        image, registers, flags = self.snapshots[step]
+        self.cpu.memory.restore(image)
+        for addr in self.breakpoints:
+            self.cpu.memory[addr] = BRK_OPCODE
+        cu = self.cpu.control_unit
+        cu.registers = dict(registers)
+        cu.flags = dict(flags)
+        self.steps = step
+        self.halted = False
+
+    # --- execution ---
+
+    def _run(self, limit: int) -> str:
+        """Run at full speed until `limit` total steps, HALT, a breakpoint or a watched write."""
+        cu = self.cpu.control_unit
+        self.stop_reason = None
+        while self.steps < limit:
+            next_snapshot = (self.steps // self.snapshot_every + 1) * self.snapshot_every
+            chunk_end = min(limit, next_snapshot)
+            steps = self.steps
+            while steps < chunk_end:
+                if not cu.clock_cycle():
+                    break
+                steps += 1
+            else:
+                self.steps = steps
+                if steps == next_snapshot and steps not in self.snapshots:
+                    self._take_snapshot()
+                continue
+            self.steps = steps
+            if self.stop_reason == "watchpoint":
+                # the store completed; advance past it like clock_cycle would have
+                cu.update_ip(cu.memory.read(cu.registers["IP"]))
+                self.steps += 1
+            elif self.stop_reason is None:
+                self.stop_reason = "halt"
+                self.halted = True
+            return self.stop_reason
+        self.stop_reason = "max_steps"
+        return self.stop_reason
+
+    def _resume(self, limit: int) -> str:
+        if self.halted:
+            return "halt"
+        ip = self.cpu.control_unit.registers["IP"]
+        if ip in self.breakpoints and self.steps < limit:
+            # execute the original instruction under the breakpoint, then re-arm it
+            self.cpu.memory[ip] = self.breakpoints[ip]
+            try:
+                reason = self._run(self.steps + 1)
+            finally:
+                self.cpu.memory[ip] = BRK_OPCODE
+            if reason != "max_steps" or self.steps >= limit:
+                return reason
+        return self._run(limit)
+
+    def cont(self, max_steps: int = 10_000) -> str:
+        """Continue until a breakpoint, watchpoint, HALT or `max_steps` total steps."""
+        return self._resume(max_steps)
+
+    def step(self, n: int = 1) -> str:
+        return self._resume(self.steps + n)
+
+    def back(self, n: int = 1) -> int:
+        """Step back n instructions. Returns the new step count."""
+        target = max(0, self.steps - n)
+        start = max(step for step in self.snapshots if step <= target)
+        self._restore_snapshot(start)
+        # replay with traps disabled so nothing stops short of the target
+        breakpoints, watchpoints = dict(self.breakpoints), set(self.watchpoints)
+        for addr in breakpoints:
+            self.remove_breakpoint(addr)
+        self.watchpoints.clear()
+        self._install_watch_handlers()
+        try:
+            self._run(target)
+        finally:
+            for addr in breakpoints:
+                self.add_breakpoint(addr)
+            self.watchpoints = watchpoints
+            self._install_watch_handlers()
+        self.stop_reason = "back"
+        return self.steps
+
+    # --- inspection ---
+
+    def read(self, addr: int) -> int:
+        """Memory as the program sees it (breakpoint traps hidden)."""
+        return self.breakpoints.get(addr, self.cpu.memory[addr])
+
+    def state(self) -> str:
+        cu = self.cpu.control_unit
+        regs = " ".join(f"{name}={value}" for name, value in cu.registers.items())
+        flags = " ".join(f"{name}={int(value)}" for name, value in cu.flags.items())
+        return f"step={self.steps} {regs} {flags}"
+
+    def repl(self, commands=None, out=print) -> None:
+        """
+        Line-oriented command loop. Reads from `commands` (any iterable of lines,
+        e.g. a script file) or stdin. Commands:
+          break ADDR | break line N | delete ADDR | watch ADDR|VAR | unwatch ADDR|VAR
+          continue [MAX_STEPS] | step [N] | back [N] | regs | mem ADDR [N] | quit
+        """
+        if commands is None:
+            commands = stdin_commands()
+        for raw in commands:
+            words = raw.split()
+            if not words:
+                continue
+            cmd, args = words[0], words[1:]
+            try:
+                match cmd:
+                    case "break" | "b" if args[:1] == ["line"]:
+                        out(f"breakpoint at {self.add_line_breakpoint(int(args[1]))}")
+                    case "break" | "b":
+                        self.add_breakpoint(int(args[0], 0))
+                        out(f"breakpoint at {int(args[0], 0)}")
+                    case "delete" | "d":
+                        self.remove_breakpoint(int(args[0], 0))
+                    case "watch" | "w":
+                        out(f"watchpoint at {self.add_watchpoint(args[0])}")
+                    case "unwatch":
+                        self.remove_watchpoint(args[0])
+                    case "continue" | "c":
+                        reason = self.cont(int(args[0]) if args else 10_000)
+                        out(self._describe(reason))
+                    case "step" | "s":
+                        out(self._describe(self.step(int(args[0]) if args else 1)))
+                    case "back" | "rs":
+                        self.back(int(args[0]) if args else 1)
+                        out(self.state())
+                    case "regs" | "r":
+                        out(self.state())
+                    case "mem" | "x":
+                        addr, n = int(args[0], 0), int(args[1]) if len(args) > 1 else 16
+                        out(" ".join(f"{self.read(a):02X}" for a in range(addr, min(addr + n, len(self.cpu.memory)))))
+                    case "quit" | "q":
+                        return
+                    case _:
+                        out(f"unknown command: {cmd}")
+            except (ValueError, IndexError) as e:
+                out(f"error: {e}")
+
+    def _describe(self, reason: str) -> str:
+        if reason == "watchpoint":
+            addr, old, new = self.last_watch
+            return f"watchpoint {addr}: {old} -> {new} | {self.state()}"
+        return f"{reason} | {self.state()}"
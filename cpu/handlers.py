@@ -151,4 +151,186 @@ HANDLERS = {
     "JZ": handle_jz,
     "JNZ": handle_jnz,
     "HALT": handle_halt,
-}
\ No newline at end of file
+}
+
+# ---------------------------------------------------------------------------
+# Extended ISA ("ext"): 16-bit little-endian addresses, eight general-purpose
+# registers R0..R7 (R0 is ACC, so accumulator code keeps working unchanged),
+# register-to-register ALU ops and a downward-growing stack addressed by SP.
+# Data words are still 8 bits wide.
+# ---------------------------------------------------------------------------
+
+REG_NAMES = ["ACC", "R1", "R2", "R3", "R4", "R5", "R6", "R7"]
+MAX_EXT_MEM = 1 << 16
+
+EXT_OPCODES = {
+    0x00: "NOP",   # No operation
+    0x01: "LDI",   # LDI imm: ACC = imm
+    0x02: "LDA",   # LDA addr16: ACC = MEM[addr]
+    0x03: "STA",   # STA addr16: MEM[addr] = ACC
+    0x10: "ADD",   # ADD addr16: ACC = ACC + MEM[addr]
+    0x11: "SUB",   # SUB addr16: ACC = ACC - MEM[addr]
+    0x12: "AND",   # AND addr16: ACC = ACC & MEM[addr]
+    0x13: "OR",    # OR addr16: ACC = ACC | MEM[addr]
+    0x14: "XOR",   # XOR addr16: ACC = ACC ^ MEM[addr]
+    0x15: "NOT",   # NOT: ACC = not ACC
+    0x16: "MUL",   # MUL addr16: ACC = ACC * MEM[addr]
+    0x20: "JMP",   # JMP addr16: IP = addr
+    0x21: "JZ",    # JZ addr16: if Z: IP = addr
+    0x22: "JNZ",   # JNZ addr16: if not Z: IP = addr
+    0x30: "MOV",   # MOV rd, rs: R[rd] = R[rs]
+    0x31: "LDR",   # LDR r, addr16: R[r] = MEM[addr]
+    0x32: "STR",   # STR r, addr16: MEM[addr] = R[r]
+    0x33: "LRI",   # LRI r, imm: R[r] = imm
+    0x40: "ADDR",  # ADDR rd, rs: R[rd] = R[rd] + R[rs]
+    0x41: "SUBR",  # SUBR rd, rs: R[rd] = R[rd] - R[rs]
+    0x42: "ANDR",  # ANDR rd, rs: R[rd] = R[rd] & R[rs]
+    0x43: "ORR",   # ORR rd, rs: R[rd] = R[rd] | R[rs]
+    0x44: "XORR",  # XORR rd, rs: R[rd] = R[rd] ^ R[rs]
+    0x45: "MULR",  # MULR rd, rs: R[rd] = R[rd] * R[rs]
+    0x50: "PUSH",  # PUSH r: SP = SP - 1; MEM[SP] = R[r]
+    0x51: "POP",   # POP r: R[r] = MEM[SP]; SP = SP + 1
+    0xFF: "HALT",  # Halt execution
+}
+
+# Operand bytes after the opcode: addresses take 2, registers and immediates take 1.
+EXT_OPCODE_ARGCOUNTS = {
+    0x00: 0, 0x01: 1, 0x02: 2, 0x03: 2,
+    0x10: 2, 0x11: 2, 0x12: 2, 0x13: 2, 0x14: 2, 0x15: 0, 0x16: 2,
+    0x20: 2, 0x21: 2, 0x22: 2,
+    0x30: 2, 0x31: 3, 0x32: 3, 0x33: 2,
+    0x40: 2, 0x41: 2, 0x42: 2, 0x43: 2, 0x44: 2, 0x45: 2,
+    0x50: 1, 0x51: 1,
+    0xFF: 0,
+}
+
+def read_addr16(control_unit, at):
+    return control_unit.memory.read(at) | (control_unit.memory.read(at + 1) << 8)
+
+def handle_lda16(control_unit):
+    addr = read_addr16(control_unit, control_unit.registers["IP"] + 1)
+    control_unit.registers["ACC"] = control_unit.memory.read(addr)
+    return True, None, False
+
+def handle_sta16(control_unit):
+    addr = read_addr16(control_unit, control_unit.registers["IP"] + 1)
+    control_unit.memory.write(addr, control_unit.registers["ACC"])
+    return True, None, False
+
+def make_alu_mem16_handler(op):
+    # ACC = ACC <op> MEM[addr16]
+    def handler(control_unit):
+        addr = read_addr16(control_unit, control_unit.registers["IP"] + 1)
+        result, flags = control_unit.alu.operate(op, control_unit.registers["ACC"], control_unit.memory.read(addr))
+        control_unit.registers["ACC"] = result
+        return True, flags, False
+    return handler
+
+def handle_jmp16(control_unit):
+    control_unit.registers["IP"] = read_addr16(control_unit, control_unit.registers["IP"] + 1)
+    return True, None, True
+
+def handle_jz16(control_unit):
+    ip = control_unit.registers["IP"]
+    if control_unit.flags.get("Z", False):
+        control_unit.registers["IP"] = read_addr16(control_unit, ip + 1)
+    else:
+        control_unit.registers["IP"] += 3  # Skip opcode and 16-bit operand
+    return True, None, True
+
+def handle_jnz16(control_unit):
+    ip = control_unit.registers["IP"]
+    if not control_unit.flags.get("Z", False):
+        control_unit.registers["IP"] = read_addr16(control_unit, ip + 1)
+    else:
+        control_unit.registers["IP"] += 3  # Skip opcode and 16-bit operand
+    return True, None, True
+
+def read_reg(control_unit, at):
+    # register operand byte -> register name
+    return REG_NAMES[control_unit.memory.read(at)]
+
+def handle_mov(control_unit):
+    ip = control_unit.registers["IP"]
+    rd, rs = read_reg(control_unit, ip + 1), read_reg(control_unit, ip + 2)
+    control_unit.registers[rd] = control_unit.registers[rs]
+    return True, None, False
+
+def handle_ldr(control_unit):
+    ip = control_unit.registers["IP"]
+    r, addr = read_reg(control_unit, ip + 1), read_addr16(control_unit, ip + 2)
+    control_unit.registers[r] = control_unit.memory.read(addr)
+    return True, None, False
+
+def handle_str(control_unit):
+    ip = control_unit.registers["IP"]
+    r, addr = read_reg(control_unit, ip + 1), read_addr16(control_unit, ip + 2)
+    control_unit.memory.write(addr, control_unit.registers[r])
+    return True, None, False
+
+def handle_lri(control_unit):
+    ip = control_unit.registers["IP"]
+    control_unit.registers[read_reg(control_unit, ip + 1)] = control_unit.memory.read(ip + 2)
+    return True, None, False
+
+def make_alu_reg_handler(op):
+    # R[rd] = R[rd] <op> R[rs]
+    def handler(control_unit):
+        ip = control_unit.registers["IP"]
+        rd, rs = read_reg(control_unit, ip + 1), read_reg(control_unit, ip + 2)
+        result, flags = control_unit.alu.operate(op, control_unit.registers[rd], control_unit.registers[rs])
+        control_unit.registers[rd] = result
+        return True, flags, False
+    return handler
+
+def handle_push(control_unit):
+    sp = control_unit.registers["SP"] - 1
+    if sp < 0:
+        raise ValueError("Stack overflow")
+    control_unit.memory.write(sp, control_unit.registers[read_reg(control_unit, control_unit.registers["IP"] + 1)])
+    control_unit.registers["SP"] = sp
+    return True, None, False
+
+def handle_pop(control_unit):
+    sp = control_unit.registers["SP"]
+    if sp >= len(control_unit.memory):
+        raise ValueError("Stack underflow")
+    control_unit.registers[read_reg(control_unit, control_unit.registers["IP"] + 1)] = control_unit.memory.read(sp)
+    control_unit.registers["SP"] = sp + 1
+    return True, None, False
+
+EXT_HANDLERS = {
+    "NOP": handle_nop,
+    "LDI": handle_ldi,
+    "LDA": handle_lda16,
+    "STA": handle_sta16,
+    "ADD": make_alu_mem16_handler("add"),
+    "SUB": make_alu_mem16_handler("sub"),
+    "AND": make_alu_mem16_handler("and"),
+    "OR": make_alu_mem16_handler("or"),
+    "XOR": make_alu_mem16_handler("xor"),
+    "NOT": handle_not,
+    "MUL": make_alu_mem16_handler("mul"),
+    "JMP": handle_jmp16,
+    "JZ": handle_jz16,
+    "JNZ": handle_jnz16,
+    "MOV": handle_mov,
+    "LDR": handle_ldr,
+    "STR": handle_str,
+    "LRI": handle_lri,
+    "ADDR": make_alu_reg_handler("add"),
+    "SUBR": make_alu_reg_handler("sub"),
+    "ANDR": make_alu_reg_handler("and"),
+    "ORR": make_alu_reg_handler("or"),
+    "XORR": make_alu_reg_handler("xor"),
+    "MULR": make_alu_reg_handler("mul"),
+    "PUSH": handle_push,
+    "POP": handle_pop,
+    "HALT": handle_halt,
+}
+
+# isa name -> (opcodes, argcounts, handlers)
+ISAS = {
+    "classic": (OPCODES, OPCODE_ARGCOUNTS, HANDLERS),
+    "ext": (EXT_OPCODES, EXT_OPCODE_ARGCOUNTS, EXT_HANDLERS),
+}
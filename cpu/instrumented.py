@@ -0,0 +1,48 @@
+# Instrumented engine variant. CPU swaps these in at construction when it is given a
+# metrics registry, so the default engine carries no counting code at all.
+from .metrics import STEP_BUCKETS
+from .cpu import Memory, ControlUnit
+from .mapped import MappedMemory
+
+class CountingMemory(Memory):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reads = 0
+        self.writes = 0
+
+    def read(self, addr: int) -> int:
+        self.reads += 1
+        return super().read(addr)
+
+    def write(self, addr: int, value: int) -> None:
+        self.writes += 1
+        super().write(addr, value)
+
+class CountingMappedMemory(CountingMemory, MappedMemory):
+    pass
+
+class InstrumentedControlUnit(ControlUnit):
+    def __init__(self, memory: Memory, alu, isa: str = "classic"):
+        super().__init__(memory, alu, isa)
+        self.opcode_counts = [0] * 256
+
+    def clock_cycle(self) -> bool:
+        # peek the opcode without going through memory.read, which would count it twice
+        self.opcode_counts[self.memory.memory[self.registers["IP"]] & 0xFF] += 1
+        return super().clock_cycle()
+
+def publish(cpu, registry, steps: int, seconds: float) -> None:
+    """Move the engine's local tallies for one run into the registry."""
+    cu, mem = cpu.control_unit, cpu.memory
+    per_opcode = registry.counter("cpu_opcode_total", "Instructions retired per opcode", ("opcode",))
+    for opcode, n in enumerate(cu.opcode_counts):
+        if n:
+            per_opcode.inc(n, (cu.opcodes.get(opcode, hex(opcode)),))
+    registry.counter("cpu_instructions_retired_total", "Instructions retired, including HALT").inc(sum(cu.opcode_counts))
+    registry.counter("cpu_memory_reads_total", "Memory reads, including instruction fetch").inc(mem.reads)
+    registry.counter("cpu_memory_writes_total", "Memory writes").inc(mem.writes)
+    registry.counter("cpu_runs_total", "Calls to CPU.run").inc()
+    registry.histogram("cpu_steps_per_run", "Steps executed per CPU.run", buckets=STEP_BUCKETS).observe(steps)
+    registry.histogram("stage_seconds", "Latency per pipeline stage", ("stage",)).observe(seconds, ("run",))
+    cu.opcode_counts = [0] * 256
+    mem.reads = mem.writes = 0
@@ -1,38 +1,124 @@
-import sys
-from pathlib import Path
-
-# Add project root to path for proper package imports
-project_root = Path(__file__).parent.parent
-if str(project_root) not in sys.path:
-    sys.path.insert(0, str(project_root))
-print(f"Running from: {__file__}")
-print(f"Project root: {project_root}")
-
-
-from cpu import CPU
-from compile import compile, assemble
 import argparse
+import os
 
-if __name__ == "__main__":
+DEFAULT_PROGRAM = os.path.join(os.path.dirname(__file__), "program.txt")
+
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Minimal 8-bit CPU runner")
     parser.add_argument("--verbose", action="store_true", help="Enable verbose tracing")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only print the final ACC value")
     parser.add_argument("--mem", type=int, default=256, help="Memory size (must be multiple of 16)")
-    parser.add_argument("--program", type=str, default="program.txt", help="Path to program file")
-    args = parser.parse_args()
-    assert args.mem % 16 == 0, f"Memory size must be a multiple of 16, got {args.mem}"
-    
-    # Compile and assemble the program
-    compiled_program = compile(args.program)
-    print(f"Compiled {len(compiled_program)} instructions")
-    
-    print("Assembling program...")
-    assembled_program = assemble(compiled_program)
-    print(f"Assembled {len(assembled_program)} bytes")
-    
+    parser.add_argument("--mapped", action="store_true", help="Back memory with an anonymous mmap (pages are allocated on first touch)")
+    parser.add_argument("--mem-image", type=str, default=None, help="Back memory with this file; it is created sparse if missing and kept after the run")
+    parser.add_argument("--program", type=str, default=DEFAULT_PROGRAM, help="Path to program file")
+    parser.add_argument("--bytecode", type=str, default=None, help="Run a prebuilt bytecode file instead of compiling --program")
+    parser.add_argument("-o", "--output", type=str, default=None, help="Write assembled bytecode to this file instead of running it")
+    parser.add_argument("--max-steps", type=int, default=10_000, help="Step budget for the run")
+    parser.add_argument("--estimate", action="store_true", help="Print a static upper bound on instructions and cycles instead of running")
+    parser.add_argument("--cache-dir", type=str, default=None, help="Memoise results in this directory; repeated runs skip execution")
+    parser.add_argument("--cache-max-mb", type=int, default=64, help="Size bound of the on-disk result cache")
+    parser.add_argument("--checkpoint-dir", type=str, default=None, help="Write periodic checkpoints of the run to this directory")
+    parser.add_argument("--checkpoint-every", type=int, default=100_000, help="Steps between checkpoints")
+    parser.add_argument("--checkpoint-seconds", type=float, default=None, help="Also checkpoint at least this often, in seconds")
+    parser.add_argument("--resume", action="store_true", help="Continue the run checkpointed in --checkpoint-dir instead of loading a program")
+    parser.add_argument("--debug", action="store_true", help="Run under the debugger, reading commands from stdin")
+    parser.add_argument("--metrics-json", type=str, default=None, help="Enable metrics and write them as JSON to this file")
+    parser.add_argument("--metrics-prom", type=str, default=None, help="Enable metrics and write them in Prometheus text format to this file")
+    parser.add_argument("--isa", choices=["classic", "ext"], default="classic", help="Target ISA (ext: 16-bit addresses, registers, stack)")
+    return parser
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.mem % 16 != 0:
+        raise SystemExit(f"Memory size must be a multiple of 16, got {args.mem}")
+    log = (lambda *a: None) if args.quiet else print
+    registry = None
+    if args.metrics_json or args.metrics_prom:
+        from cpu import metrics
+        registry = metrics.enable()
+
+    if args.resume:
+        if args.checkpoint_dir is None:
+            raise SystemExit("--resume needs --checkpoint-dir")
+        from cpu.checkpoint import resume
+        ckpt = resume(args.checkpoint_dir, args.max_steps, every_steps=args.checkpoint_every,
+                      every_seconds=args.checkpoint_seconds, metrics=registry,
+                      mapped=args.mapped, mem_image=args.mem_image)
+        log(f"Resumed from {args.checkpoint_dir}; {ckpt.steps} steps in total")
+        return report(ckpt.cpu, args, registry)
+
+    # Subsystems are imported only when needed: running prebuilt bytecode never loads the compiler.
+    if args.estimate and args.bytecode is not None:
+        raise SystemExit("--estimate works on compiled source, not --bytecode")
+    if args.bytecode is not None:
+        with open(args.bytecode, "rb") as f:
+            assembled_program = list(f.read())
+        log(f"Loaded {len(assembled_program)} bytes")
+    else:
+        from compile import compile, assemble
+        compiled_program = compile(args.program, isa=args.isa, metrics=registry)
+        log(f"Compiled {len(compiled_program)} instructions")
+
+        log("Assembling program...")
+        assembled_program = assemble(compiled_program, isa=args.isa, metrics=registry)
+        log(f"Assembled {len(assembled_program)} bytes")
+
+    if args.estimate:
+        from compile.analyze import estimate
+        est = estimate(compiled_program, isa=args.isa)
+        if args.quiet:
+            print(est.instructions if est.bounded else "unbounded")
+        elif est.bounded:
+            print(f"Instructions <= {est.instructions}, cycles <= {est.cycles}")
+        else:
+            print("Unbounded: " + ", ".join(f"loop at {loop['header']}" for loop in est.loops if loop["trips"] is None))
+        return 0
+
+    if args.output is not None:
+        with open(args.output, "wb") as f:
+            f.write(bytes(assembled_program))  # ValueError if an operand does not fit in a byte
+        log(f"Wrote {args.output}")
+        return 0
+
     # Run the program
-    cpu = CPU(mem_sz=args.mem, verbose=args.verbose)
+    from cpu import CPU
+    cpu = CPU(mem_sz=args.mem, verbose=args.verbose, isa=args.isa, metrics=registry,
+              mapped=args.mapped, mem_image=args.mem_image)
     cpu.load_program(assembled_program)
-    cpu.run()
-    print(f'--------------------------------')
-    print(f'Final Result: {cpu.control_unit.registers["ACC"]}')
-    print(f'--------------------------------')
\ No newline at end of file
+    if args.debug:
+        from cpu.debugger import Debugger
+        from compile.compile_from_ast import line_table, variables
+        Debugger(cpu, line_table=line_table, variables=variables).repl()
+    elif args.checkpoint_dir is not None:
+        from cpu.checkpoint import Checkpointer
+        Checkpointer(cpu, args.checkpoint_dir, every_steps=args.checkpoint_every,
+                     every_seconds=args.checkpoint_seconds).run(args.max_steps)
+    elif args.cache_dir is not None:
+        from cpu.memo import ResultCache
+        cache = ResultCache(disk_dir=args.cache_dir, disk_max_bytes=args.cache_max_mb << 20)
+        cache.run(cpu, args.max_steps)
+        stats = cache.stats()
+        log(f"Result cache: {stats['hits'] + stats['disk_hits']} hit(s), {stats['misses']} miss(es)")
+        if registry is not None:
+            cache.publish(registry)
+    else:
+        cpu.run(args.max_steps)
+    return report(cpu, args, registry)
+
+def report(cpu, args, registry) -> int:
+    if args.mem_image is not None:
+        cpu.memory.close()  # flushes the image to disk
+    if args.quiet:
+        print(cpu.control_unit.registers["ACC"])
+    else:
+        print(f'--------------------------------')
+        print(f'Final Result: {cpu.control_unit.registers["ACC"]}')
+        print(f'--------------------------------')
+    if args.metrics_json:
+        registry.write_json(args.metrics_json)
+    if args.metrics_prom:
+        registry.write_prometheus(args.metrics_prom)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
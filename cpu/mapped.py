@@ -0,0 +1,83 @@
+"""
+Memory backed by mmap instead of a Python list.
+
+Without a path the mapping is anonymous and private: the OS hands out zero pages
+on first touch, so a large --mem costs nothing until the program uses it. With a
+path the mapping is a shared view of a (sparse) file, so the image persists
+between runs and other processes can map the same file read-only to inspect it
+without copying.
+"""
+import mmap
+import os
+from .cpu import Memory
+
+class MappedMemory(Memory):
+    def __init__(self, size: int | None = 256, path: str | None = None, readonly: bool = False):
+        self.path = path
+        self.readonly = readonly
+        self._fd = None
+        if path is None:
+            if size is None or readonly:
+                raise ValueError("An anonymous mapping needs a size and must be writable")
+            self.memory = mmap.mmap(-1, size, flags=mmap.MAP_PRIVATE | mmap.MAP_ANONYMOUS)
+            return
+        self._fd = os.open(path, os.O_RDONLY if readonly else os.O_RDWR | os.O_CREAT, 0o644)
+        file_size = os.fstat(self._fd).st_size
+        if size is None:
+            size = file_size
+        if size == 0:
+            os.close(self._fd)
+            raise ValueError(f"Cannot map an empty image: {path}")
+        if file_size < size:
+            if readonly:
+                os.close(self._fd)
+                raise ValueError(f"{path} holds {file_size} bytes, {size} requested")
+            os.ftruncate(self._fd, size)  # extends with a hole: no disk blocks until written
+        access = mmap.ACCESS_READ if readonly else mmap.ACCESS_WRITE
+        self.memory = mmap.mmap(self._fd, size, access=access)
+
+    @classmethod
+    def open(cls, path: str, readonly: bool = True) -> "MappedMemory":
+        """Map an existing image at its full size, read-only by default."""
+        return cls(None, path, readonly)
+
+    def __setitem__(self, addr: int, value: int) -> None:
+        self.memory[addr] = value & 0xFF
+
+    def write(self, addr: int, value: int) -> None:
+        self.memory[addr] = value & 0xFF
+
+    def load_bytes(self, bytes_: list[int], at: int = 0) -> None:
+        for i, byte in enumerate(bytes_):
+            if not 0 <= byte <= 0xFF:
+                raise ValueError(f"Byte {byte} at offset {i} does not fit in a memory cell")
+        self.memory[at:at + len(bytes_)] = bytes(bytes_)
+
+    def snapshot(self) -> list[int]:
+        return list(self.memory[:])  # slicing yields ints; iterating an mmap yields 1-byte bytes
+
+    def restore(self, image: list[int]) -> None:
+        self.memory[:] = bytes(v & 0xFF for v in image)
+
+    def clear(self) -> None:
+        size = len(self.memory)
+        if self._fd is None and hasattr(mmap, "MADV_DONTNEED"):
+            self.memory.madvise(mmap.MADV_DONTNEED)  # private anonymous pages read back as zero
+        elif self._fd is not None and not self.readonly:
+            # punch the whole file back to a hole instead of writing zeros over it
+            os.ftruncate(self._fd, 0)
+            os.ftruncate(self._fd, size)
+        else:
+            self.memory[:] = bytes(size)
+
+    def flush(self) -> None:
+        """Write dirty pages of a file-backed image back to disk."""
+        if self._fd is not None and not self.readonly:
+            self.memory.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self.memory.close()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,188 @@
+"""
+Content-addressed memoisation of CPU.run results.
+
+A run is fully determined by the ISA, the memory image and registers at the
+start of the run, and the step budget, so those are hashed into the key. Entries
+hold the final registers and flags, the step count, whether the run halted and
+the memory cells the run changed. A hit restores that state without executing,
+leaving the CPU exactly as a real run would.
+
+Two tiers: an in-process LRU, and an optional size-bounded directory shared by
+concurrent runners. Disk entries are written to a temp file and renamed into
+place, so readers never see a partial entry and racing writers are harmless
+(both write the same content).
+"""
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+
+class ResultCache:
+    def __init__(self, max_entries: int = 1024, disk_dir: str | None = None,
+                 disk_max_bytes: int = 64 << 20):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.entries = OrderedDict()  # key -> entry, least recently used first
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._disk_bytes = 0
+        if disk_dir is not None:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_files())
+
+    # --- keys and entries ---
+
+    @staticmethod
+    def key_for(cpu, max_steps: int, image: list[int] | None = None) -> str:
+        # image: the snapshot of cpu.memory, if the caller already took one
+        if image is None:
+            image = cpu.memory.snapshot()
+        h = hashlib.sha256()
+        h.update(f"{cpu.isa}:{len(image)}:{max_steps}:".encode())
+        h.update(json.dumps([cpu.control_unit.registers, cpu.control_unit.flags], sort_keys=True).encode())
+        h.update(bytes(image))
+        return h.hexdigest()
+
+    @staticmethod
+    def entry_from(cpu, initial: list[int]) -> dict:
+        """Final state of a run that started from the memory image initial."""
+        final = cpu.memory.snapshot()
+        return {
+            "acc": cpu.control_unit.registers["ACC"],
+            "halted": cpu.halted,
+            "steps": cpu.steps,
+            "registers": dict(cpu.control_unit.registers),
+            "flags": dict(cpu.control_unit.flags),
+            "writes": [[addr, value] for addr, (old, value) in enumerate(zip(initial, final)) if old != value],
+        }
+
+    @staticmethod
+    def apply(cpu, entry: dict) -> int:
+        cpu.control_unit.registers = dict(entry["registers"])
+        cpu.control_unit.flags = dict(entry["flags"])
+        cpu.steps = entry["steps"]
+        cpu.halted = entry["halted"]
+        for addr, value in entry["writes"]:
+            cpu.memory[addr] = value
+        return entry["acc"]
+
+    # --- tiers ---
+
+    def lookup(self, key: str) -> dict | None:
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        entry = self._disk_read(key)
+        if entry is not None and "writes" in entry:  # older entries did not record memory
+            self.disk_hits += 1
+            self._remember(key, entry)
+            return entry
+        self.misses += 1
+        return None
+
+    def store(self, key: str, entry: dict) -> None:
+        self._remember(key, entry)
+        if self.disk_dir is not None:
+            self._disk_write(key, entry)
+
+    def run(self, cpu, max_steps: int = 10_000) -> int:
+        """CPU.run, skipping execution entirely on a cache hit."""
+        initial = cpu.memory.snapshot()
+        key = self.key_for(cpu, max_steps, initial)
+        entry = self.lookup(key)
+        if entry is not None:
+            return self.apply(cpu, entry)
+        acc = cpu.run(max_steps)
+        self.store(key, self.entry_from(cpu, initial))
+        return acc
+
+    def _remember(self, key: str, entry: dict) -> None:
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], key + ".json")
+
+    def _disk_read(self, key: str) -> dict | None:
+        if self.disk_dir is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            os.utime(path)  # mtime doubles as last-use time for eviction
+            return entry
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _disk_write(self, key: str, entry: dict) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps(entry, separators=(",", ":")).encode()
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._disk_bytes += len(data)
+        if self._disk_bytes > self.disk_max_bytes:
+            self._evict()
+
+    def _disk_files(self) -> list[tuple[str, int, float]]:
+        files = []
+        for sub in os.listdir(self.disk_dir):
+            subdir = os.path.join(self.disk_dir, sub)
+            if not os.path.isdir(subdir):
+                continue
+            for name in os.listdir(subdir):
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(subdir, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:  # evicted by another runner
+                    continue
+                files.append((path, st.st_size, st.st_mtime))
+        return files
+
+    def _evict(self) -> None:
+        # Rescan (other runners share the directory) and drop least recently used
+        # files until the tier is back under 90% of its budget.
+        files = sorted(self._disk_files(), key=lambda f: f[2])
+        total = sum(size for _, size, _ in files)
+        for path, size, _ in files:
+            if total <= self.disk_max_bytes * 0.9:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._disk_bytes = total
+
+    # --- reporting ---
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+    def publish(self, registry) -> None:
+        """Export hit/miss counts to a metrics registry."""
+        hits = registry.counter("result_cache_hits_total", "Result cache hits", ("tier",))
+        hits.inc(self.hits, ("memory",))
+        hits.inc(self.disk_hits, ("disk",))
+        registry.counter("result_cache_misses_total", "Result cache misses").inc(self.misses)
@@ -0,0 +1,126 @@
+# Metrics registry
+"""
+Opt-in counters and histograms for the emulator and compiler.
+
+Everything lives in one Registry that can be exported as JSON or in the
+Prometheus text format. Nothing is recorded unless a registry is passed in:
+`compile`/`assemble` take `metrics=registry` and only then time their stages,
+and CPU picks an instrumented engine at construction when given one, so the
+emulator's hot loop is never instrumented by a flag check. The compiler only
+calls Registry methods, so it does not import this module.
+"""
+import json
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.0001, 0.001, 0.01, 0.1, 1.0, 10.0)
+STEP_BUCKETS = (10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.values = {}  # label values -> total
+
+    def inc(self, amount: float = 1, labels: tuple = ()) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self.values = {}  # label values -> {"buckets": [...], "count": n, "sum": s}
+
+    def observe(self, value: float, labels: tuple = ()) -> None:
+        if labels not in self.values:
+            self.values[labels] = {"buckets": [0] * len(self.buckets), "count": 0, "sum": 0}
+        entry = self.values[labels]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                entry["buckets"][i] += 1  # cumulative, as in Prometheus
+        entry["count"] += 1
+        entry["sum"] += value
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def _get(self, cls, name: str, help: str, labelnames: tuple, **kwargs):
+        if name not in self.metrics:
+            self.metrics[name] = cls(name, help, labelnames, **kwargs)
+        return self.metrics[name]
+
+    def counter(self, name: str, help: str, labelnames: tuple = ()) -> Counter:
+        return self._get(Counter, name, help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, labelnames, buckets=buckets)
+
+    @contextmanager
+    def stage_timer(self, stage: str):
+        """Record the latency of a compiler/emulator stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.histogram("stage_seconds", "Latency per pipeline stage", ("stage",)).observe(
+                time.perf_counter() - start, (stage,))
+
+    def count(self, name: str, help: str, amount: float = 1) -> None:
+        self.counter(name, help).inc(amount)
+
+    def to_dict(self) -> dict:
+        out = {}
+        for name, metric in self.metrics.items():
+            samples = [{"labels": dict(zip(metric.labelnames, labels)), "value": value}
+                       for labels, value in metric.values.items()]
+            out[name] = {"type": metric.kind, "help": metric.help, "samples": samples}
+            if metric.kind == "histogram":
+                out[name]["buckets"] = list(metric.buckets)
+        return out
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self) -> str:
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for labels, value in metric.values.items():
+                pairs = [f'{k}="{v}"' for k, v in zip(metric.labelnames, labels)]
+                if metric.kind == "counter":
+                    lines.append(f"{name}{format_labels(pairs)} {value}")
+                    continue
+                for bound, count in zip(metric.buckets, value["buckets"]):
+                    le = format_labels(pairs + [f'le="{bound}"'])
+                    lines.append(f"{name}_bucket{le} {count}")
+                le = format_labels(pairs + ['le="+Inf"'])
+                lines.append(f"{name}_bucket{le} {value['count']}")
+                lines.append(f"{name}_sum{format_labels(pairs)} {value['sum']}")
+                lines.append(f"{name}_count{format_labels(pairs)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w") as f:
+            f.write(self.to_json())
+
+    def write_prometheus(self, path: str) -> None:
+        with open(path, "w") as f:
+            f.write(self.to_prometheus())
+
+def format_labels(pairs: list[str]) -> str:
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+REGISTRY = Registry()
+
+def enable() -> Registry:
+    """Return the process-wide registry, to be passed to compile/assemble and CPU."""
+    return REGISTRY
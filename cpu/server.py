@@ -0,0 +1,230 @@
+"""
+Persistent job server: keeps worker processes, CPU instances and the compile
+cache warm so a request costs one emulation rather than a Python startup.
+
+Protocol: newline-delimited JSON over a Unix socket or TCP. Requests may be
+pipelined; each response carries the request's "id" and responses are written
+as jobs finish, so they can arrive out of order.
+
+    request:  {"id": 1, "source": "x = 2\\nreturn x + 3", "isa": "classic",
+               "mem": 256, "max_steps": 10000, "timeout": 1.0}
+              ("bytecode": [1, 2, ...] may be sent instead of "source")
+    response: {"id": 1, "ok": true, "acc": 5, "steps": 4, "halt_reason": "halt", "cached": false, "elapsed_ms": 0.2}
+              {"id": 1, "ok": false, "error": "busy"}
+
+halt_reason is "halt", "max_steps" or "timeout". "mem" must be a multiple of 16
+no larger than 65536, "isa" a known ISA, "max_steps" at most --max-steps and
+"timeout" at most --timeout, which is also the default; other requests get an
+error response.
+Each worker memoises results (see cpu/memo.py); with --cache-dir the workers also
+share an on-disk tier.
+
+    python -m cpu.server --unix /tmp/cpu.sock --workers 4
+    python -m cpu.server --port 7878
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from .handlers import ISAS, MAX_EXT_MEM
+
+STEP_CHUNK = 5_000  # steps between time-budget checks
+MAX_MEM = MAX_EXT_MEM  # largest memory a request may ask for
+MAX_CPUS = 8  # warm CPU instances kept per worker
+MAX_STEPS = 10_000_000  # default cap on a request's max_steps (--max-steps)
+TIMEOUT = 5.0  # default for requests without "timeout", and the largest allowed (--timeout)
+
+def check_job(job: dict, max_steps: int = MAX_STEPS, max_timeout: float = TIMEOUT) -> None:
+    """Reject jobs a worker should never build or that could hold it indefinitely; raises ValueError."""
+    isa, mem = job.get("isa", "classic"), job.get("mem", 256)
+    if isa not in ISAS:
+        raise ValueError(f"unknown isa {isa!r}")
+    if type(mem) is not int or not 0 < mem <= MAX_MEM or mem % 16 != 0:
+        raise ValueError(f"mem must be a multiple of 16 between 16 and {MAX_MEM}, got {mem!r}")
+    steps = job.get("max_steps", 10_000)
+    if type(steps) is not int or not 0 < steps <= max_steps:
+        raise ValueError(f"max_steps must be an integer between 1 and {max_steps}, got {steps!r}")
+    timeout = job.get("timeout")
+    if timeout is not None and (type(timeout) not in (int, float) or not 0 < timeout <= max_timeout):
+        raise ValueError(f"timeout must be a number of seconds up to {max_timeout}, got {timeout!r}")
+
+# --- worker side ---
+
+_cpus = OrderedDict()  # (isa, mem) -> CPU, least recently used first
+_cache = None  # ResultCache, created by warm_worker
+_limits = (MAX_STEPS, TIMEOUT)  # (max_steps cap, default and largest timeout), set by warm_worker
+
+@lru_cache(maxsize=1024)
+def compile_cached(source: str, isa: str) -> tuple[int, ...]:
+    from compile import compile, assemble
+    return tuple(assemble(compile(src=source, isa=isa), isa=isa))
+
+def warm_worker(cache_dir: str | None = None, max_steps: int = MAX_STEPS, timeout: float = TIMEOUT) -> None:
+    """Pool initializer: import everything and build a default CPU up front."""
+    global _cache, _limits
+    from cpu import CPU
+    from cpu.memo import ResultCache
+    _cache = ResultCache(disk_dir=cache_dir)
+    _limits = (max_steps, timeout)
+    _cpus[("classic", 256)] = CPU(256)
+    compile_cached("return 0", "classic")
+
+def run_job(job: dict) -> dict:
+    from cpu import CPU
+    check_job(job, *_limits)
+    isa, mem = job.get("isa", "classic"), job.get("mem", 256)
+    if "source" in job:
+        program = compile_cached(job["source"], isa)
+    else:
+        program = job["bytecode"]
+    key = (isa, mem)
+    if key not in _cpus:
+        _cpus[key] = CPU(mem, isa=isa)
+        if len(_cpus) > MAX_CPUS:
+            _cpus.popitem(last=False)
+    _cpus.move_to_end(key)
+    cpu = _cpus[key]
+    cpu.reset()
+    cpu.load_program(program)
+
+    max_steps = job.get("max_steps", 10_000)
+    start = time.perf_counter()
+    initial = cpu.memory.snapshot()
+    key = _cache.key_for(cpu, max_steps, initial)
+    entry = _cache.lookup(key)
+    if entry is not None:
+        return {
+            "ok": True,
+            "acc": entry["acc"],
+            "steps": entry["steps"],
+            "halt_reason": "halt" if entry["halted"] else "max_steps",
+            "cached": True,
+            "elapsed_ms": (time.perf_counter() - start) * 1000,
+        }
+
+    deadline = time.monotonic() + (job.get("timeout") or _limits[1])
+    steps, reason = 0, "max_steps"
+    while steps < max_steps:
+        cpu.run(min(STEP_CHUNK, max_steps - steps))
+        steps += cpu.steps
+        if cpu.halted:
+            reason = "halt"
+            break
+        if time.monotonic() > deadline:
+            reason = "timeout"
+            break
+    if reason != "timeout":  # timeouts depend on wall-clock time, not just the inputs
+        cpu.steps = steps
+        _cache.store(key, _cache.entry_from(cpu, initial))
+    return {
+        "ok": True,
+        "acc": cpu.control_unit.registers["ACC"],
+        "steps": steps,
+        "halt_reason": reason,
+        "cached": False,
+        "elapsed_ms": (time.perf_counter() - start) * 1000,
+    }
+
+# --- server side ---
+
+class JobServer:
+    def __init__(self, workers: int = os.cpu_count() or 1, max_pending: int | None = None,
+                 max_inflight_per_conn: int = 64, cache_dir: str | None = None,
+                 max_steps: int = MAX_STEPS, timeout: float = TIMEOUT):
+        self.workers = workers
+        self.max_steps = max_steps
+        self.timeout = timeout
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=warm_worker,
+                                        initargs=(cache_dir, max_steps, timeout))
+        self.max_pending = max_pending if max_pending is not None else workers * 16
+        self.max_inflight_per_conn = max_inflight_per_conn
+        self.pending = 0
+
+    def warm(self) -> None:
+        # start the worker processes (running warm_worker) before the first request arrives
+        list(self.pool.map(run_job, [{"source": "return 0"}] * self.workers))
+
+    async def submit(self, job: dict) -> dict:
+        try:
+            check_job(job, self.max_steps, self.timeout)
+        except ValueError as e:
+            return {"ok": False, "error": f"bad request: {e}"}
+        if self.pending >= self.max_pending:
+            return {"ok": False, "error": "busy"}
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.pool, run_job, job)
+        except Exception as e:
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        finally:
+            self.pending -= 1
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # Per-connection cap on in-flight jobs: once reached we stop reading, so a client
+        # that pipelines faster than the pool drains sees TCP backpressure.
+        inflight = asyncio.Semaphore(self.max_inflight_per_conn)
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def respond(job_id, job: dict | None, error: str | None = None) -> None:
+            try:
+                result = await self.submit(job) if error is None else {"ok": False, "error": error}
+                result["id"] = job_id
+                async with write_lock:
+                    writer.write((json.dumps(result) + "\n").encode())
+                    await writer.drain()
+            finally:
+                inflight.release()
+
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                await inflight.acquire()
+                try:
+                    job = json.loads(line)
+                    task = asyncio.create_task(respond(job.get("id"), job))
+                except (ValueError, AttributeError) as e:
+                    task = asyncio.create_task(respond(None, None, f"bad request: {e}"))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+
+    async def serve(self, unix: str | None = None, host: str = "127.0.0.1", port: int = 7878) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.warm)
+        if unix is not None:
+            server = await asyncio.start_unix_server(self.handle, path=unix)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Persistent CPU job server")
+    parser.add_argument("--unix", type=str, default=None, help="Listen on this Unix socket path")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7878)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-pending", type=int, default=None, help="Jobs in flight before new ones are rejected as busy")
+    parser.add_argument("--cache-dir", type=str, default=None, help="On-disk result cache shared by the workers")
+    parser.add_argument("--max-steps", type=int, default=MAX_STEPS, help="Largest max_steps a request may ask for")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT, help="Seconds a job may run: the default and the largest per-request timeout")
+    args = parser.parse_args(argv)
+    server = JobServer(workers=args.workers, max_pending=args.max_pending, cache_dir=args.cache_dir,
+                       max_steps=args.max_steps, timeout=args.timeout)
+    try:
+        asyncio.run(server.serve(unix=args.unix, host=args.host, port=args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.pool.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
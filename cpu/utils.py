@@ -5,6 +5,9 @@ def print_state(cpu, step):
     print(f"  IP : {cpu.control_unit.registers['IP']}")
     print(f"  ACC: {cpu.control_unit.registers['ACC']}")
     print(f"  Z  : {cpu.control_unit.flags['Z']}")
+    for name in ("R1", "R2", "R3", "R4", "R5", "R6", "R7", "SP"):
+        if name in cpu.control_unit.registers:
+            print(f"  {name:<3}: {cpu.control_unit.registers[name]}")
     # Print memory as a grid (16 bytes per row, hex format)
     mem = cpu.memory
     row_sz = 16
@@ -0,0 +1,117 @@
+"""
+Load-time bytecode verifier.
+
+Walks every instruction reachable from address 0 (following fall-through and
+JMP/JZ/JNZ targets) and checks that:
+  - each reachable opcode is valid for the ISA,
+  - operands, memory operands and jump targets lie inside memory,
+  - jump targets land on instruction boundaries (no two reachable instructions overlap),
+  - register operands name an existing register.
+It also records whether any store can write into the reachable code.
+
+Programs that verify and cannot modify their own code may run on
+ControlUnit.run_unchecked, which skips all per-step validation.
+"""
+from .handlers import ISAS, REG_NAMES
+
+# name -> [(offset, kind)]; kinds: imm, reg, read/write (memory operand), target (jump), stack
+CLASSIC_OPERANDS = {
+    "LDI": [(1, "imm")],
+    "LDA": [(1, "read")], "ADD": [(1, "read")], "SUB": [(1, "read")],
+    "AND": [(1, "read")], "OR": [(1, "read")], "XOR": [(1, "read")],
+    "STA": [(1, "write")],
+    "JMP": [(1, "target")], "JZ": [(1, "target")], "JNZ": [(1, "target")],
+}
+EXT_OPERANDS = {
+    "LDI": [(1, "imm")],
+    "LDA": [(1, "read")], "ADD": [(1, "read")], "SUB": [(1, "read")], "AND": [(1, "read")],
+    "OR": [(1, "read")], "XOR": [(1, "read")], "MUL": [(1, "read")],
+    "STA": [(1, "write")],
+    "JMP": [(1, "target")], "JZ": [(1, "target")], "JNZ": [(1, "target")],
+    "MOV": [(1, "reg"), (2, "reg")],
+    "LDR": [(1, "reg"), (2, "read")], "STR": [(1, "reg"), (2, "write")], "LRI": [(1, "reg"), (2, "imm")],
+    "ADDR": [(1, "reg"), (2, "reg")], "SUBR": [(1, "reg"), (2, "reg")], "ANDR": [(1, "reg"), (2, "reg")],
+    "ORR": [(1, "reg"), (2, "reg")], "XORR": [(1, "reg"), (2, "reg")], "MULR": [(1, "reg"), (2, "reg")],
+    "PUSH": [(1, "reg"), (0, "stack")], "POP": [(1, "reg"), (0, "stack")],
+}
+OPERANDS = {"classic": CLASSIC_OPERANDS, "ext": EXT_OPERANDS}
+ADDR_WIDTH = {"classic": 1, "ext": 2}
+UNCONDITIONAL = ("JMP", "HALT")  # no fall-through
+
+class VerifyResult:
+    def __init__(self):
+        self.errors = []
+        self.instructions = {}  # reachable instruction start -> mnemonic
+        self.code_bytes = set()
+        self.write_targets = set()
+        self.dynamic_writes = False  # stack pushes: targets depend on SP at runtime
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    @property
+    def writes_code(self) -> bool:
+        return bool(self.write_targets & self.code_bytes)
+
+    @property
+    def fast_path_ok(self) -> bool:
+        return self.ok and not self.writes_code and not self.dynamic_writes
+
+    def __repr__(self) -> str:
+        return (f"VerifyResult(ok={self.ok}, instructions={len(self.instructions)}, "
+                f"writes_code={self.writes_code}, dynamic_writes={self.dynamic_writes}, errors={self.errors!r})")
+
+def verify(memory, isa: str = "classic", entry: int = 0) -> VerifyResult:
+    opcodes, argcounts, _ = ISAS[isa]
+    operands = OPERANDS[isa]
+    width = ADDR_WIDTH[isa]
+    size = len(memory)
+    result = VerifyResult()
+    owner = {}  # byte address -> start of the instruction covering it
+    worklist = [entry]
+    while worklist:
+        addr = worklist.pop()
+        if addr in result.instructions:
+            continue
+        if not 0 <= addr < size:
+            result.errors.append(f"control reaches {addr}, outside memory of {size} bytes")
+            continue
+        opcode = memory[addr]
+        if opcode not in opcodes:
+            result.errors.append(f"invalid opcode {opcode} at {addr}")
+            continue
+        name = opcodes[opcode]
+        end = addr + argcounts[opcode] + 1
+        if end > size:
+            result.errors.append(f"{name} at {addr} runs past the end of memory")
+            continue
+        overlap = [owner[b] for b in range(addr, end) if b in owner]
+        if overlap:
+            result.errors.append(f"{name} at {addr} overlaps the instruction at {overlap[0]}")
+            continue
+        for b in range(addr, end):
+            owner[b] = addr
+        result.instructions[addr] = name
+        result.code_bytes.update(range(addr, end))
+
+        for offset, kind in operands.get(name, []):
+            if kind == "stack":
+                result.dynamic_writes = True
+                continue
+            if kind == "reg":
+                if memory[addr + offset] >= len(REG_NAMES):
+                    result.errors.append(f"{name} at {addr} names register {memory[addr + offset]}")
+                continue
+            if kind == "imm":
+                continue
+            value = sum(memory[addr + offset + i] << (8 * i) for i in range(width))
+            if not 0 <= value < size:
+                result.errors.append(f"{name} at {addr} references {value}, outside memory of {size} bytes")
+            elif kind == "write":
+                result.write_targets.add(value)
+            elif kind == "target":
+                worklist.append(value)
+        if name not in UNCONDITIONAL:
+            worklist.append(end)
+    return result
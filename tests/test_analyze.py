@@ -0,0 +1,53 @@
+import pytest
+
+from compile import compile, assemble, estimate
+from cpu import CPU
+
+def actual_steps(source, isa):
+    cpu = CPU(256, isa=isa)
+    cpu.load_program(assemble(compile(src=source, isa=isa), isa=isa))
+    cpu.run(1_000_000)
+    assert cpu.halted
+    return cpu.steps + 1  # the estimate counts HALT, CPU.steps does not
+
+def estimated(source, isa):
+    return estimate(compile(src=source, isa=isa), isa=isa)
+
+EXACT = [
+    "x = 2\ny = 5\nz = x + y + 3\nreturn z",
+    "a = 7\nb = 3\nreturn a - b + 1",
+    "x = 0\ny = 2\nwhile x != 5\n    x = x + 1\n    y = y + x\nendwhile\nreturn y",
+    "x = 0\nwhile x != 5\n    x = x + 3\nendwhile\nreturn x",
+    "x = 10\nwhile x != 0\n    x = x - 1\nendwhile\nreturn x",
+]
+
+@pytest.mark.parametrize("isa", ["classic", "ext"])
+@pytest.mark.parametrize("source", EXACT)
+def test_exact_on_straight_line_and_induction_loops(isa, source):
+    est = estimated(source, isa)
+    assert est.bounded
+    assert est.instructions == actual_steps(source, isa)
+
+def test_trip_count_wraps_around():
+    est = estimated("x = 0\nwhile x != 5\n    x = x + 3\nendwhile\nreturn x", "classic")
+    assert [loop["trips"] for loop in est.loops] == [87]  # 3 * 87 = 261 = 5 (mod 256)
+
+@pytest.mark.parametrize("isa", ["classic", "ext"])
+def test_unreachable_exit_is_unbounded(isa):
+    est = estimated("x = 0\nwhile x != 5\n    x = x + 2\nendwhile\nreturn x", isa)
+    assert not est.bounded
+    assert est.instructions is None
+
+SOUND = [
+    "x = 0\ny = 0\nwhile x != 4\n    z = 0\n    while z != 3\n        y = y + 1\n        z = z + 1\n    endwhile\n    x = x + 1\nendwhile\nreturn y",
+    "x = 0\ny = 0\nwhile x != 6\n    if x == 3\n        y = y + 10\n    endif\n    x = x + 1\nendwhile\nreturn y",
+    "x = 4\ny = 2\nif x == 4\n    y = y + 10\nendif\nif y != 12\n    y = 0\nendif\nreturn y",
+    "x = 0\ny = 1\nwhile x != 3\n    w = 0\n    while w != y\n        w = w + 1\n    endwhile\n    y = y + y\n    x = x + 1\nendwhile\nreturn w",
+]
+
+@pytest.mark.parametrize("isa", ["classic", "ext"])
+@pytest.mark.parametrize("source", SOUND)
+def test_bound_is_sound_for_nested_loops_and_ifs(isa, source):
+    est = estimated(source, isa)
+    assert est.bounded
+    assert est.instructions >= actual_steps(source, isa)
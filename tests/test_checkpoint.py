@@ -0,0 +1,57 @@
+import json
+import os
+import zlib
+
+from compile import compile, assemble
+from cpu import CPU
+from cpu.checkpoint import Checkpointer, resume
+
+SOURCE = "x = 0\ny = 0\nwhile x != 200\n    y = y + x\n    x = x + 1\nendwhile\nreturn y\n"
+
+def load(isa="classic"):
+    cpu = CPU(256, isa=isa)
+    cpu.load_program(assemble(compile(src=SOURCE, isa=isa), isa=isa))
+    return cpu
+
+def final_state(cpu, steps):
+    cu = cpu.control_unit
+    return cu.registers, cu.flags, cpu.memory.snapshot(), steps
+
+def test_resume_twice_matches_uninterrupted_run(tmp_path):
+    for isa in ("classic", "ext"):
+        reference = load(isa)
+        reference.run(100_000)
+        directory = str(tmp_path / isa)
+
+        Checkpointer(load(isa), directory, every_steps=500).run(1200)
+        resume(directory, 1200)  # nothing left to run: must not clobber the last delta
+        ckpt = resume(directory, 100_000)
+
+        assert ckpt.halted
+        assert final_state(ckpt.cpu, ckpt.steps) == final_state(reference, reference.steps)
+
+def test_resume_after_halt_writes_nothing(tmp_path):
+    directory = str(tmp_path)
+    Checkpointer(load(), directory, every_steps=500).run(100_000)
+    ckpt = resume(directory, 100_000)
+    assert ckpt.written == 0
+
+def test_restore_reverifies_before_fast_path(tmp_path):
+    directory = str(tmp_path)
+    Checkpointer(load(), directory, every_steps=500).run(1200)
+    assert Checkpointer.restore(directory).cpu.fast_path
+
+    # hand-edit the latest checkpoint so memory no longer verifies; it still says "fast"
+    with open(os.path.join(directory, "MANIFEST")) as f:
+        manifest = json.load(f)
+    path = os.path.join(directory, (manifest["deltas"] or [manifest["base"]])[-1])
+    with open(path, "rb") as f:
+        payload = json.loads(zlib.decompress(f.read()))
+    page = bytearray(bytes.fromhex(payload["pages"]["0"]))
+    page[0] = 0xEE  # not an opcode
+    payload["pages"]["0"] = page.hex()
+    with open(path, "wb") as f:
+        f.write(zlib.compress(json.dumps(payload).encode()))
+
+    assert payload["state"]["engine"] == "fast"
+    assert not Checkpointer.restore(directory).cpu.fast_path
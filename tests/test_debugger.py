@@ -0,0 +1,38 @@
+import pytest
+
+from compile import compile, assemble
+from cpu import CPU
+import compile.compile_from_ast as compiler
+from cpu.debugger import Debugger
+
+def debugger(source, isa="classic"):
+    cpu = CPU(256, isa=isa)
+    cpu.load_program(assemble(compile(src=source, isa=isa), isa=isa))
+    return Debugger(cpu)
+
+def test_breakpoint_on_operand_is_refused():
+    dbg = debugger("y = 2\nreturn y")
+    out = []
+    dbg.repl(["break 1", "continue"], out=out.append)
+    assert out[0].startswith("error:")
+    assert dbg.cpu.control_unit.registers["ACC"] == 2
+
+def test_breakpoint_on_data_is_refused():
+    dbg = debugger("y = 2\nreturn y")
+    y = int(compiler.variables["y"], 16)
+    with pytest.raises(ValueError):
+        dbg.add_breakpoint(y)
+    dbg.cont()
+    assert dbg.read(y) == dbg.cpu.memory[y] == 2
+
+@pytest.mark.parametrize("isa", ["classic", "ext"])
+def test_breakpoint_stops_and_resumes(isa):
+    source = "x = 0\ny = 2\nwhile x != 5\n    x = x + 1\n    y = y + x\nendwhile\nreturn y"
+    dbg = debugger(source, isa)
+    start = next(addr for addr in sorted(dbg.instructions) if addr > 0)
+    dbg.add_breakpoint(start)
+    assert dbg.cont() == "breakpoint"
+    assert dbg.cpu.control_unit.registers["IP"] == start
+    dbg.remove_breakpoint(start)
+    assert dbg.cont() == "halt"
+    assert dbg.cpu.control_unit.registers["ACC"] == 17
@@ -0,0 +1,61 @@
+import pytest
+
+from compile import compile, assemble
+from cpu import CPU
+from cpu.main import main
+
+def run(source, isa, mem=256):
+    program = assemble(compile(src=source, isa=isa), isa=isa)
+    cpu = CPU(mem, isa=isa)
+    cpu.load_program(program)
+    return cpu.run(100_000)
+
+SUB_CHAIN = "a = 90\nb = 3\nreturn " + " - ".join(["a"] + ["b"] * 8)
+ADD_CHAIN = "a = 7\nb = 30\nreturn " + " + ".join(["a", "b"] * 5)
+
+SOURCES = [
+    SUB_CHAIN,
+    ADD_CHAIN,
+    "x = 2\ny = 5\nz = x + y + 3\nreturn z",
+    "a = 7\nb = 3\nreturn a - b + 1",
+    "x = 0\ny = 2\nwhile x != 5\n    x = x + 1\n    y = y + x\nendwhile\nreturn y",
+    "x = 4\ny = 2\nif x == 4\n    y = y + 10\nendif\nreturn y",
+    "x = 3\ny = 2\nif x != 4\n    y = y - x - 1\nendif\nreturn y",
+]
+
+@pytest.mark.parametrize("source", SOURCES)
+def test_ext_matches_classic(source):
+    assert run(source, "ext") == run(source, "classic")
+
+def test_deep_chain_spills_to_stack():
+    compiled = compile(src=SUB_CHAIN, isa="ext")
+    assert ("PUSH", 0) in compiled  # more temporaries than R1..R6
+    assert run(SUB_CHAIN, "ext") == run(SUB_CHAIN, "classic")
+
+@pytest.mark.parametrize("source, expected", [
+    ("a = 7\nb = 3\nc = a * b + 2 * a\nreturn c", 35),
+    ("a = 20\nreturn a * a", 400 % 256),
+    ("a = 3\nb = 5\nreturn a * b - a - a", 9),
+])
+def test_multiply(source, expected):
+    assert run(source, "ext") == expected
+
+def test_multiply_needs_ext():
+    with pytest.raises(RuntimeError):
+        compile(src="a = 2\nreturn a * a", isa="classic")
+
+def test_program_larger_than_256_bytes(tmp_path, capsys):
+    lines = ["x = 0", "y = 1"] + ["x = x + 3\ny = y + x"] * 40 + ["return x + y"]
+    source = "\n".join(lines)
+    program = assemble(compile(src=source, isa="ext"), isa="ext")
+    assert len(program) > 256
+    with pytest.raises(RuntimeError):
+        compile(src=source, isa="classic")  # does not fit below the classic data area
+
+    x, y = 0, 1
+    for _ in range(40):
+        x, y = (x + 3) % 256, (y + x + 3) % 256
+    path = tmp_path / "big.txt"
+    path.write_text(source)
+    assert main(["-q", "--isa", "ext", "--mem", "4096", "--program", str(path)]) == 0
+    assert capsys.readouterr().out.strip() == str((x + y) % 256)
@@ -0,0 +1,25 @@
+import pytest
+
+from compile import compile, assemble
+from cpu import CPU
+
+SOURCES = [
+    "x = 420\nreturn x\n",
+    "x = 0\ny = 0\nwhile x != 200\n    y = y + x\n    x = x + 1\nendwhile\nreturn y\n",
+]
+
+@pytest.mark.parametrize("isa", ["classic", "ext"])
+@pytest.mark.parametrize("source", SOURCES)
+def test_backends_agree(isa, source):
+    program = assemble(compile(src=source, isa=isa), isa=isa)
+    results = []
+    for mapped in (False, True):
+        cpu = CPU(256, isa=isa, mapped=mapped)
+        cpu.load_program(program)
+        results.append((cpu.run(100_000), cpu.steps, cpu.memory.snapshot()))
+    assert results[0] == results[1]
+
+@pytest.mark.parametrize("mapped", [False, True])
+def test_wide_bytes_rejected(mapped):
+    with pytest.raises(ValueError):
+        CPU(mapped=mapped).load_program([0x01, 420, 0xFF])
@@ -0,0 +1,23 @@
+from compile import compile, assemble
+from cpu import CPU
+from cpu.memo import ResultCache
+
+SOURCE = "x = 200\ny = 88\nreturn x + y\n"
+
+def load():
+    cpu = CPU(256)
+    cpu.load_program(assemble(compile(src=SOURCE)))
+    return cpu
+
+def test_hit_restores_memory(tmp_path):
+    reference = load()
+    reference.run()
+    for cache in (ResultCache(), ResultCache(disk_dir=str(tmp_path))):
+        cache.run(load())
+        if cache.disk_dir is not None:
+            cache.entries.clear()  # force the hit to come from disk
+        cpu = load()
+        assert cache.run(cpu) == reference.control_unit.registers["ACC"]
+        assert cache.hits + cache.disk_hits == 1
+        assert cpu.memory.snapshot() == reference.memory.snapshot()
+        assert cpu.control_unit.registers == reference.control_unit.registers
@@ -0,0 +1,19 @@
+import subprocess
+import sys
+
+from compile import compile, assemble
+from cpu import metrics
+
+def test_compiler_records_into_given_registry():
+    registry = metrics.Registry()
+    assemble(compile(src="x = 2\nreturn x + 3", metrics=registry), metrics=registry)
+    samples = registry.to_dict()["stage_seconds"]["samples"]
+    assert [s["labels"]["stage"] for s in samples] == ["lex", "parse", "compile_ast", "assemble"]
+    assert registry.to_dict()["assembler_bytes_total"]["samples"][0]["value"] > 0
+
+def test_compiler_does_not_import_cpu():
+    code = ("import sys, compile\n"
+            "compile.assemble(compile.compile(src='x = 2\\nreturn x'))\n"
+            "print(any(m == 'cpu' or m.startswith('cpu.') for m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
@@ -0,0 +1,27 @@
+import pytest
+
+from cpu import server
+
+SPIN = "x = 0\nwhile x != 1\n    x = x + 2\nendwhile\nreturn x\n"
+
+@pytest.mark.parametrize("job", [
+    {"mem": 2**31}, {"mem": 7}, {"mem": True}, {"isa": "x86"},
+    {"max_steps": 10**12}, {"max_steps": "lots"}, {"max_steps": 0},
+    {"timeout": 3600}, {"timeout": "1"},
+])
+def test_check_job_rejects(job):
+    with pytest.raises(ValueError):
+        server.check_job({"source": "return 0", **job})
+
+def test_check_job_accepts_defaults():
+    server.check_job({"source": "return 0"})
+    server.check_job({"source": "return 0", "mem": 4096, "isa": "ext", "max_steps": 1000, "timeout": 0.5})
+
+def test_run_job_is_bounded_by_default_timeout():
+    server.warm_worker(max_steps=10**9, timeout=0.05)
+    try:
+        result = server.run_job({"source": SPIN, "max_steps": 10**9})
+        assert result["halt_reason"] == "timeout"
+        assert server.run_job({"source": "x = 2\nreturn x + 3"})["acc"] == 5
+    finally:
+        server.warm_worker()
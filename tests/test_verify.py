@@ -0,0 +1,70 @@
+import pytest
+
+from compile import compile, assemble
+from cpu import CPU, Memory
+from cpu.verify import verify
+
+LDI, LDA, STA, JMP, JNZ, HALT = 0x01, 0x02, 0x03, 0x20, 0x22, 0xFF
+PUSH, POP = 0x50, 0x51
+
+def verified(program, isa="classic", size=256):
+    memory = Memory(size)
+    memory.load_bytes(program)
+    return verify(memory, isa)
+
+def test_valid_program():
+    result = verified([LDI, 5, STA, 0xA0, LDA, 0xA0, HALT])
+    assert result.ok and result.fast_path_ok
+    assert sorted(result.instructions) == [0, 2, 4, 6]
+
+def test_invalid_reachable_opcode():
+    result = verified([LDI, 5, 0xEE])
+    assert not result.ok and "invalid opcode" in result.errors[0]
+
+def test_unreachable_garbage_is_ignored():
+    assert verified([JMP, 3, 0xEE, HALT]).ok
+
+def test_memory_operand_out_of_range():
+    result = verified([LDA, 0x00, 0x10, HALT], isa="ext")  # LDA 0x1000 in 256 bytes
+    assert not result.ok and "outside memory" in result.errors[0]
+
+def test_jump_target_out_of_range():
+    result = verified([JMP, 200], size=64)
+    assert not result.ok and "outside memory" in result.errors[0]
+
+def test_jump_into_middle_of_instruction():
+    result = verified([JNZ, 1, HALT])  # byte 1 is JNZ's operand, which decodes as LDI
+    assert not result.ok and "overlaps" in result.errors[0]
+
+def test_store_into_code():
+    result = verified([LDI, 7, STA, 0x01, HALT])  # overwrites LDI's own operand
+    assert result.ok and result.writes_code and not result.fast_path_ok
+
+@pytest.mark.parametrize("program", [[PUSH, 0, HALT], [POP, 1, HALT]])
+def test_stack_disables_fast_path(program):
+    result = verified(program, isa="ext")
+    assert result.ok and result.dynamic_writes and not result.fast_path_ok
+    cpu = CPU(256, isa="ext")
+    cpu.load_program(program)
+    assert not cpu.fast_path
+
+SOURCES = [
+    "x = 2\ny = 5\nz = x + y + 3\nreturn z",
+    "x = 0\ny = 2\nwhile x != 5\n    x = x + 1\n    y = y + x\nendwhile\nreturn y",
+    "x = 4\ny = 2\nif x == 4\n    y = y + 10\nendif\nreturn y",
+    "a = 200\nb = 100\nreturn a + b",
+]
+
+@pytest.mark.parametrize("isa", ["classic", "ext"])
+@pytest.mark.parametrize("source", SOURCES)
+def test_fast_and_checked_engines_agree(isa, source):
+    program = assemble(compile(src=source, isa=isa), isa=isa)
+    results = []
+    for fast in (True, False):
+        cpu = CPU(256, isa=isa)
+        cpu.load_program(program)
+        assert cpu.fast_path
+        cpu.fast_path = fast
+        cpu.run(100_000)
+        results.append((cpu.control_unit.registers, cpu.control_unit.flags, cpu.steps, cpu.memory.snapshot()))
+    assert results[0] == results[1]